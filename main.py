@@ -12,17 +12,30 @@ Runs:
 
 import os
 import json
+import time
 import asyncio
+import functools
+from datetime import datetime, timezone
 from contextlib import asynccontextmanager
 from fastapi import FastAPI, Request, BackgroundTasks
-from fastapi.responses import JSONResponse, HTMLResponse
+from fastapi.responses import ORJSONResponse, HTMLResponse, StreamingResponse
 from dotenv import load_dotenv
 
 load_dotenv()
 
+# uvloop is a drop-in, libuv-backed event loop — noticeably lower per-callback
+# overhead for the webhook handlers. Falls back to stock asyncio if missing.
+try:
+    import uvloop
+    uvloop.install()
+except ImportError:
+    pass
+
 # Import all modules
 from module2_agent_brain import SalesAgentBrain
-from module3_voice_agent import VapiCallManager, vapi_webhook
+from module3_voice_agent import (
+    VapiCallManager, vapi_webhook, init_http_client, close_http_client, stop_transcript_flusher,
+)
 from module4_outreach import OutreachOrchestrator, WhatsAppManager
 from module5_orchestrator import SalesAgentOrchestrator, LeadStateManager
 
@@ -34,19 +47,51 @@ orchestrator = SalesAgentOrchestrator()
 async def lifespan(app: FastAPI):
     """Start background tasks when app starts."""
     print("🚀 AI Sales Agent starting up...")
-    # Start the scheduler in background
-    loop = asyncio.get_event_loop()
-    loop.run_in_executor(None, start_scheduler)
-    yield
-    print("Shutting down...")
-
-def start_scheduler():
-    """Start the APScheduler in a thread."""
+    # Long-lived clients shared by every request (HTTP pools, prompt caches, chat memory)
+    app.state.brain  = SalesAgentBrain()
+    app.state.wa_mgr = WhatsAppManager()
+    app.state.caller = VapiCallManager()
+    await init_http_client()
+    # Resolve the Vapi assistant in the background — startup doesn't wait on Vapi,
+    # and calls placed meanwhile wait on the registration lock
+    app.state.assistant_lookup = asyncio.create_task(asyncio.to_thread(app.state.caller._assistant_id))
+    loop = asyncio.get_running_loop()
+    # Eager tasks run inline until their first real suspension (Python 3.12+)
+    if hasattr(asyncio, "eager_task_factory"):
+        loop.set_task_factory(asyncio.eager_task_factory)
+    # AsyncIOScheduler binds to the running loop — no extra thread needed
     try:
         orchestrator.scheduler.start()
         print("✅ Scheduler started")
     except Exception as e:
         print(f"Scheduler error: {e}")
+    yield
+    print("Shutting down...")
+    # Stop scheduling new jobs before the clients they use are closed
+    if orchestrator.scheduler.running:
+        orchestrator.scheduler.shutdown(wait=False)
+    await stop_transcript_flusher()
+    await close_http_client()
+    await orchestrator.aclose()
+    await app.state.wa_mgr.aclose()
+
+
+# ── Leads read cache ──────────────────────────────────────────────────────────
+# `/` and `/leads` get polled by uptime monitors — skip re-reading the leads DB
+# when nothing has been committed in the last couple of seconds.
+_state = LeadStateManager()
+_LEADS_CACHE_TTL = 2.0
+_leads_cache = {"version": None, "data": None, "ts": 0.0}
+
+def _cached_leads() -> list[dict]:
+    version = _state.version()
+    now = time.monotonic()
+    if (_leads_cache["data"] is not None and version == _leads_cache["version"]
+            and now - _leads_cache["ts"] < _LEADS_CACHE_TTL):
+        return _leads_cache["data"]
+    data = _state.load_all()
+    _leads_cache.update(version=version, data=data, ts=now)
+    return data
 
 
 # ── App ───────────────────────────────────────────────────────────────────────
@@ -54,23 +99,28 @@ app = FastAPI(
     title="AI Sales Agent",
     description="Automated sales pipeline for DigitalBoost Agency",
     version="1.0.0",
-    lifespan=lifespan
+    lifespan=lifespan,
+    default_response_class=ORJSONResponse,
 )
 
 
 # ── Health Check ──────────────────────────────────────────────────────────────
 @app.get("/")
 async def root():
-    state = LeadStateManager()
-    leads = state.load_all()
+    # Memoized on (leads DB version, scheduler state) — re-checked with one cheap PRAGMA
+    return _root_payload(_state.version(), orchestrator.scheduler.running)
+
+@functools.lru_cache(maxsize=1)
+def _root_payload(leads_version: tuple, scheduler_running: bool) -> dict:
+    counts = _state.count_by_stage()
     return {
         "status": "✅ AI Sales Agent is LIVE",
-        "total_leads": len(leads),
+        "total_leads": sum(counts.values()),
         "by_stage": {
-            stage: len([l for l in leads if l.get("stage") == stage])
-            for stage in ["new", "contacted", "discovery", "qualified", "pitched", "closed", "cold"]
+            stage: counts.get(stage, 0)
+            for stage in ("new", "contacted", "discovery", "qualified", "pitched", "closed", "cold")
         },
-        "scheduler": "running" if orchestrator.scheduler.running else "stopped"
+        "scheduler": "running" if scheduler_running else "stopped"
     }
 
 @app.get("/health")
@@ -87,10 +137,13 @@ async def handle_vapi_webhook(request: Request):
 
 # ── Twilio WhatsApp Inbound Webhook ───────────────────────────────────────────
 @app.post("/twilio/whatsapp/inbound")
-async def handle_whatsapp_inbound(request: Request):
+async def handle_whatsapp_inbound(request: Request, background_tasks: BackgroundTasks):
     """
     Twilio calls this when a prospect replies on WhatsApp.
     Set this URL in Twilio Console → WhatsApp Sandbox → When a message comes in
+
+    Acknowledges immediately; the LLM reply + Twilio send run after the
+    response so Twilio never times out and retries.
     """
     form = await request.form()
     from_number = form.get("From", "").replace("whatsapp:", "")
@@ -98,17 +151,22 @@ async def handle_whatsapp_inbound(request: Request):
 
     print(f"[WhatsApp Inbound] From: {from_number} | Message: {message_body}")
 
+    background_tasks.add_task(_process_whatsapp_inbound, request.app.state.wa_mgr, from_number, message_body)
+    return ORJSONResponse({"status": "queued"})
+
+async def _process_whatsapp_inbound(wa_mgr: WhatsAppManager, from_number: str, message_body: str):
+    """
+    Generate the AI reply, send it, and update the pipeline. Runs on the event loop
+    after the webhook has been acknowledged; each step awaits non-blocking I/O.
+    """
     # Get AI response
-    wa_mgr = WhatsAppManager()
-    ai_response = wa_mgr.handle_inbound_whatsapp(from_number, message_body)
+    ai_response = await wa_mgr.ahandle_inbound_whatsapp(from_number, message_body)
 
     # Send reply back
-    wa_mgr._send_whatsapp(from_number, ai_response)
+    await wa_mgr.asend_whatsapp(from_number, ai_response)
 
     # Also update orchestrator pipeline
-    orchestrator.handle_response(from_number, message_body, channel="whatsapp")
-
-    return JSONResponse({"status": "replied"})
+    await orchestrator.handle_response(from_number, message_body, "whatsapp")
 
 
 # ── Manual Trigger Endpoints (for testing) ────────────────────────────────────
@@ -128,9 +186,12 @@ async def trigger_followups(background_tasks: BackgroundTasks):
 async def trigger_lead_sourcing(background_tasks: BackgroundTasks):
     """Run the lead sourcing pipeline."""
     from module1_lead_sourcing import LeadSourcingPipeline
-    async def run():
+    def run():
+        # Sync on purpose: BackgroundTasks runs plain functions in the threadpool,
+        # so the (long, blocking) sourcing run stays off the event loop
         pipeline = LeadSourcingPipeline()
         pipeline.run(cities=["Mumbai", "Delhi", "Bangalore"], max_leads=100)
+        _state.import_json()   # pull the fresh leads.json into the leads DB
     background_tasks.add_task(run)
     return {"status": "triggered", "message": "Lead sourcing started in background"}
 
@@ -142,15 +203,15 @@ async def trigger_test_call(request: Request):
     name  = body.get("name", "Test Lead")
     
     if not phone:
-        return JSONResponse({"error": "phone required"}, status_code=400)
+        return ORJSONResponse({"error": "phone required"}, status_code=400)
     
-    caller = VapiCallManager()
+    caller = request.app.state.caller
     test_lead = {
         "name": name, "phone": phone,
         "website": "https://test.com", "pain_points": ["low traffic"],
         "email": "", "city": "Mumbai"
     }
-    result = caller.make_outbound_call(test_lead)
+    result = await asyncio.to_thread(caller.make_outbound_call, test_lead)
     return {"status": "call_initiated", "call_id": result.get("id")}
 
 @app.post("/trigger/test-chat")
@@ -159,41 +220,65 @@ async def trigger_test_chat(request: Request):
     body = await request.json()
     message = body.get("message", "Hello, who is this?")
     
-    brain = SalesAgentBrain()
+    brain = request.app.state.brain
     test_lead = {
         "name": "Test Lead", "email": "test@example.com",
         "phone": "+919999999999", "website": "https://mystore.in",
         "city": "Mumbai", "pain_points": ["slow website", "bad SEO"], "stage": "new"
     }
-    result = brain.chat(test_lead, message, channel="whatsapp")
+    result = await brain.achat(test_lead, message, channel="whatsapp")
     return {"ai_response": result["response"], "stage": result["stage"], "action": result["action"]}
 
+@app.post("/trigger/test-chat/stream")
+async def trigger_test_chat_stream(request: Request):
+    """Test the streaming brain with the call-channel prompt (plain-text chunks)."""
+    body = await request.json()
+    message = body.get("message", "Hello, who is this?")
+    
+    brain = request.app.state.brain
+    test_lead = {
+        "name": "Test Lead", "email": "test@example.com",
+        "phone": "+919999999999", "website": "https://mystore.in",
+        "city": "Mumbai", "pain_points": ["slow website", "bad SEO"], "stage": "new"
+    }
+    return StreamingResponse(brain.chat_stream(test_lead, message, channel="call"), media_type="text/plain")
+
 
 # ── Leads API ─────────────────────────────────────────────────────────────────
 @app.get("/leads")
 async def get_leads(stage: str = None):
     """View all leads, optionally filtered by stage."""
-    state = LeadStateManager()
-    leads = state.load_all()
     if stage:
-        leads = [l for l in leads if l.get("stage") == stage]
+        leads = await asyncio.to_thread(_state.get_leads_by_stage, stage)
+    else:
+        leads = await asyncio.to_thread(_cached_leads)
     return {"total": len(leads), "leads": leads}
 
 @app.post("/leads/add")
 async def add_lead(request: Request):
     """Manually add a lead."""
     body = await request.json()
-    state = LeadStateManager()
-    leads = state.load_all()
-    from datetime import datetime
     body["stage"] = "new"
-    body["created_at"] = datetime.utcnow().isoformat()
+    now = datetime.now(timezone.utc)
+    body["created_at"] = now.isoformat()
+    body["created_at_ts"] = int(now.timestamp())
     body["pain_points"] = body.get("pain_points", [])
-    leads.append(body)
-    state.save_all(leads)
+    # Single indexed insert, off the event loop
+    try:
+        added = await asyncio.to_thread(_state.append_one, body)
+    except ValueError as e:
+        return ORJSONResponse({"error": str(e)}, status_code=400)
+    if not added:
+        return ORJSONResponse({"status": "exists", "id": body["id"]}, status_code=409)
     return {"status": "added", "lead": body}
 
 
 if __name__ == "__main__":
     import uvicorn
-    uvicorn.run(app, host="0.0.0.0", port=int(os.getenv("PORT", 8000)))
+    uvicorn.run(
+        app,
+        host="0.0.0.0",
+        port=int(os.getenv("PORT", 8000)),
+        loop="uvloop",
+        http="httptools",
+    )
@@ -39,12 +39,14 @@ class Lead:
     pain_points: list = None           # populated during discovery
     stage: str = "new"                 # new → contacted → qualified → pitched → closed
     created_at: str = ""
+    created_at_ts: int = 0             # same instant as epoch seconds — cheap date arithmetic
 
     def __post_init__(self):
         if self.pain_points is None:
             self.pain_points = []
         if not self.created_at:
             self.created_at = datetime.utcnow().isoformat()
+            self.created_at_ts = int(time.time())
 
 
 # ── Source 1: Google Maps (Places API) ───────────────────────────────────────
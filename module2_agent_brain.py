@@ -12,10 +12,14 @@ Handles:
 """
 
 import os
-import json
-from typing import Optional
+import re
+import asyncio
+import threading
+import orjson
+from collections import OrderedDict, deque
+from datetime import datetime, timezone
+from typing import AsyncIterator, Optional
 from langchain_openai import ChatOpenAI
-from langchain.memory import ConversationBufferWindowMemory
 from langchain.schema import SystemMessage, HumanMessage, AIMessage
 from langchain.prompts import ChatPromptTemplate, MessagesPlaceholder
 from langchain_core.output_parsers import StrOutputParser
@@ -23,6 +27,8 @@ from langchain_core.runnables import RunnablePassthrough
 
 # ── Config ────────────────────────────────────────────────────────────────────
 OPENAI_API_KEY = os.getenv("OPENAI_API_KEY")
+LLM_MAX_CONCURRENCY = int(os.getenv("LLM_MAX_CONCURRENCY", "32"))   # in-flight OpenAI calls per process
+GENERATION_CACHE_SIZE = 4096   # cached opening/follow-up texts, keyed by exact prompt
 
 # Your service packages (customize these)
 SERVICE_PACKAGES = {
@@ -85,8 +91,91 @@ Known pain points: {pain_points}
 City: {lead_city}
 """
 
+# SERVICE_PACKAGES never changes at runtime — serialize it once
+_SERVICES_JSON = orjson.dumps(SERVICE_PACKAGES, option=orjson.OPT_INDENT_2).decode()
+
+_CALL_SUFFIX     = "\n\nIMPORTANT: This is a PHONE CALL. Keep responses under 3 sentences. Sound natural and conversational."
+_EMAIL_SUFFIX    = "\n\nIMPORTANT: This is an EMAIL. Be professional but warm. Use proper paragraphs."
+_WA_SUFFIX       = "\n\nIMPORTANT: This is WHATSAPP. Keep it casual, short, use minimal formatting."
+_CHANNEL_SUFFIX  = {"call": _CALL_SUFFIX, "email": _EMAIL_SUFFIX, "whatsapp": _WA_SUFFIX}
+
+# Stage-detection keywords: single words are matched against a token set,
+# multi-word phrases keep a (short) substring scan.
+_TOKEN_RE        = re.compile(r"[\w']+")
+_CLOSE_WORDS     = frozenset({"yes", "proceed", "confirm", "confirmed"})
+_CLOSE_PHRASES   = ("let's do it", "sounds good", "go ahead")
+_QUOTE_WORDS     = frozenset({"package", "packages", "inr", "pricing", "investment"})
+_HANDOFF_WORDS   = frozenset({"legal", "reference", "references"})
+_HANDOFF_PHRASES = ("contract terms", "refund policy", "case study")
+
+
+# ── LLM Request Batcher ───────────────────────────────────────────────────────
+class BrainBatcher:
+    """
+    Coalesces concurrent chat turns into small batches of parallel `ainvoke`s.
+    Collects up to `max_batch` requests or waits `max_delay_ms`, whichever comes
+    first, so bursts of inbound messages share the LLM client's connection pool.
+    Each batch is dispatched as its own task and the queue keeps draining, so a slow
+    call never holds up the turns behind it — overall concurrency is bounded by the
+    `ainvoke` semaphore, not by `max_batch`.
+    """
+
+    def __init__(self, ainvoke, max_batch: int = 8, max_delay_ms: int = 50):
+        self.ainvoke = ainvoke   # async callable: messages -> LLM response
+        self.max_batch = max_batch
+        self.max_delay = max_delay_ms / 1000
+        self._queue: asyncio.Queue | None = None
+        self._worker: asyncio.Task | None = None
+        self._in_flight: set[asyncio.Task] = set()   # strong refs to dispatched batches
+
+    async def submit(self, messages: list):
+        """Queue one LLM call and wait for its response."""
+        if self._worker is None or self._worker.done():
+            self._queue = asyncio.Queue()
+            self._worker = asyncio.create_task(self._run())
+        future = asyncio.get_running_loop().create_future()
+        await self._queue.put((messages, future))
+        return await future
+
+    async def _run(self):
+        loop = asyncio.get_running_loop()
+        while True:
+            batch = [await self._queue.get()]
+            # Idle (nothing queued or in flight) → send right away; only bursts wait to coalesce
+            idle = self._queue.empty() and not self._in_flight
+            deadline = loop.time() + (0 if idle else self.max_delay)
+            while len(batch) < self.max_batch:
+                timeout = deadline - loop.time()
+                if timeout <= 0:
+                    break
+                try:
+                    batch.append(await asyncio.wait_for(self._queue.get(), timeout))
+                except asyncio.TimeoutError:
+                    break
+
+            task = asyncio.create_task(self._dispatch(batch))
+            self._in_flight.add(task)
+            task.add_done_callback(self._in_flight.discard)
+
+    async def _dispatch(self, batch: list):
+        results = await asyncio.gather(
+            *(self.ainvoke(messages) for messages, _ in batch),
+            return_exceptions=True
+        )
+        for (_, future), result in zip(batch, results):
+            if future.done():   # caller went away
+                continue
+            if isinstance(result, BaseException):
+                future.set_exception(result)
+            else:
+                future.set_result(result)
+
 
 # ── Sales Agent Brain ─────────────────────────────────────────────────────────
+# Shared by every brain in the process (main, the email + WhatsApp managers and the
+# orchestrator each build one), so LLM_MAX_CONCURRENCY caps OpenAI calls process-wide
+_llm_sem = asyncio.Semaphore(LLM_MAX_CONCURRENCY)
+
 class SalesAgentBrain:
     def __init__(self):
         self.llm = ChatOpenAI(
@@ -94,28 +183,52 @@ class SalesAgentBrain:
             api_key=OPENAI_API_KEY,
             temperature=0.7,
         )
-        self.memories: dict[str, ConversationBufferWindowMemory] = {}  # per lead
+        self.memories: dict[str, deque] = {}  # per lead: last 20 turns of Human/AI messages
         self.lead_stages: dict[str, str] = {}
-
-    def _get_memory(self, lead_id: str) -> ConversationBufferWindowMemory:
+        self._sys_prompt_cache: dict[str, tuple] = {}  # lead_id -> (lead fields, rendered prompt)
+        self._sys_msg_cache: dict[tuple, tuple] = {}   # (lead_id, channel) -> (prompt, SystemMessage)
+        self.batcher = BrainBatcher(self._ainvoke)
+        # LRU of prompt -> generated text for openings/follow-ups (shared by sync + async paths)
+        self._gen_cache: OrderedDict[str, str] = OrderedDict()
+        self._gen_cache_lock = threading.Lock()
+
+    async def _ainvoke(self, messages: list):
+        """`llm.ainvoke` bounded by LLM_MAX_CONCURRENCY."""
+        async with _llm_sem:
+            return await self.llm.ainvoke(messages)
+
+    def _get_memory(self, lead_id: str) -> deque:
         if lead_id not in self.memories:
-            self.memories[lead_id] = ConversationBufferWindowMemory(
-                k=20,  # last 20 turns
-                return_messages=True,
-                memory_key="history"
-            )
+            self.memories[lead_id] = deque(maxlen=40)  # last 20 turns
         return self.memories[lead_id]
 
-    def _build_system_prompt(self, lead: dict) -> str:
-        services_str = json.dumps(SERVICE_PACKAGES, indent=2)
-        pain_points = ", ".join(lead.get("pain_points", [])) or "unknown — need to discover"
-        return SYSTEM_PROMPT.format(
-            services=services_str,
+    def _build_system_prompt(self, lead: dict, lead_id: str = None) -> str:
+        lead_id = lead_id or lead.get("email") or lead.get("phone") or lead.get("name")
+        pain = lead.get("pain_points", [])
+        key = (lead.get("name"), lead.get("website"), tuple(pain), lead.get("city"))
+        cached = self._sys_prompt_cache.get(lead_id)
+        if cached and cached[0] == key:
+            return cached[1]
+
+        pain_points = ", ".join(pain) or "unknown — need to discover"
+        prompt = SYSTEM_PROMPT.format(
+            services=_SERVICES_JSON,
             lead_name=lead.get("name", "there"),
             lead_website=lead.get("website", "unknown"),
             pain_points=pain_points,
             lead_city=lead.get("city", "")
         )
+        self._sys_prompt_cache[lead_id] = (key, prompt)
+        return prompt
+
+    def _get_system_message(self, lead: dict, lead_id: str, channel: str) -> SystemMessage:
+        """Channel-suffixed SystemMessage, rebuilt only when the lead's prompt changes."""
+        prompt = self._build_system_prompt(lead, lead_id)
+        cached = self._sys_msg_cache.get((lead_id, channel))
+        if cached is None or cached[0] is not prompt:
+            cached = (prompt, SystemMessage(content=prompt + _CHANNEL_SUFFIX.get(channel, "")))
+            self._sys_msg_cache[(lead_id, channel)] = cached
+        return cached[1]
 
     def chat(self, lead: dict, user_message: str, channel: str = "call") -> dict:
         """
@@ -134,28 +247,49 @@ class SalesAgentBrain:
                 "suggested_package": str | None
             }
         """
+        lead_id, messages = self._prepare_turn(lead, user_message, channel)
+        response = self.llm.invoke(messages)
+        return self._finish_turn(lead_id, user_message, response.content)
+
+    async def achat(self, lead: dict, user_message: str, channel: str = "call") -> dict:
+        """Async `chat` — awaits OpenAI on the event loop (via the batcher) instead of blocking a thread."""
+        lead_id, messages = self._prepare_turn(lead, user_message, channel)
+        response = await self.batcher.submit(messages)
+        return self._finish_turn(lead_id, user_message, response.content)
+
+    async def chat_stream(self, lead: dict, user_message: str, channel: str = "call") -> AsyncIterator[str]:
+        """
+        Streaming `achat` — yields response text as OpenAI generates it so the caller
+        can start TTS / delivery before the last token. Memory and stage tracking are
+        updated once the stream completes.
+        """
+        lead_id, messages = self._prepare_turn(lead, user_message, channel)
+        parts = []
+        async with _llm_sem:
+            async for chunk in self.llm.astream(messages):
+                if chunk.content:
+                    parts.append(chunk.content)
+                    yield chunk.content
+        self._finish_turn(lead_id, user_message, "".join(parts))
+
+    def _prepare_turn(self, lead: dict, user_message: str, channel: str) -> tuple:
+        """Build the message list for one turn. Returns (lead_id, messages)."""
         lead_id = lead.get("email") or lead.get("phone") or lead.get("name")
         memory = self._get_memory(lead_id)
         
-        # Build messages
-        system = self._build_system_prompt(lead)
-        history = memory.load_memory_variables({})["history"]
-        
-        messages = [SystemMessage(content=system)] + history + [HumanMessage(content=user_message)]
-        
-        # Add channel instruction
-        if channel == "call":
-            messages[0].content += "\n\nIMPORTANT: This is a PHONE CALL. Keep responses under 3 sentences. Sound natural and conversational."
-        elif channel == "email":
-            messages[0].content += "\n\nIMPORTANT: This is an EMAIL. Be professional but warm. Use proper paragraphs."
-        elif channel == "whatsapp":
-            messages[0].content += "\n\nIMPORTANT: This is WHATSAPP. Keep it casual, short, use minimal formatting."
+        # Build messages (cached system message + history + new turn) in one list
+        messages = [self._get_system_message(lead, lead_id, channel)]
+        messages.extend(memory)
+        messages.append(HumanMessage(content=user_message))
 
-        response = self.llm.invoke(messages)
-        ai_response = response.content
+        return lead_id, messages
 
+    def _finish_turn(self, lead_id: str, user_message: str, ai_response: str) -> dict:
+        """Save the turn to memory and detect stage + next action."""
         # Save to memory
-        memory.save_context({"input": user_message}, {"output": ai_response})
+        memory = self._get_memory(lead_id)
+        memory.append(HumanMessage(content=user_message))
+        memory.append(AIMessage(content=ai_response))
 
         # Detect stage + next action
         stage, action, package = self._detect_stage(ai_response, user_message, lead_id)
@@ -171,19 +305,20 @@ class SalesAgentBrain:
         """Simple rule-based stage detector (can be upgraded to LLM classifier)."""
         lower_ai = ai_response.lower()
         lower_user = user_msg.lower()
+        user_tokens = set(_TOKEN_RE.findall(lower_user))
 
         # Detect close signals
-        if any(w in lower_user for w in ["yes", "let's do it", "sounds good", "proceed", "go ahead", "confirm"]):
+        if _CLOSE_WORDS & user_tokens or any(p in lower_user for p in _CLOSE_PHRASES):
             self.lead_stages[lead_id] = "closed"
-            return "closed", "close", self._detect_package(ai_response)
+            return "closed", "close", self._detect_package(ai_response, lower_ai)
 
         # Detect quote request
-        if any(w in lower_ai for w in ["₹", "package", "inr", "pricing", "investment"]):
+        if "₹" in lower_ai or not _QUOTE_WORDS.isdisjoint(_TOKEN_RE.findall(lower_ai)):
             self.lead_stages[lead_id] = "pitched"
-            return "pitched", "send_quote", self._detect_package(ai_response)
+            return "pitched", "send_quote", self._detect_package(ai_response, lower_ai)
 
         # Detect human handoff needed
-        if any(w in lower_user for w in ["legal", "contract terms", "refund policy", "case study", "reference"]):
+        if _HANDOFF_WORDS & user_tokens or any(p in lower_user for p in _HANDOFF_PHRASES):
             return "qualified", "human_handoff", None
 
         # Detect discovery
@@ -194,8 +329,9 @@ class SalesAgentBrain:
         current = self.lead_stages.get(lead_id, "contacted")
         return current, "continue", None
 
-    def _detect_package(self, text: str) -> Optional[str]:
-        text_lower = text.lower()
+    def _detect_package(self, text: str, text_lower: Optional[str] = None) -> Optional[str]:
+        if text_lower is None:
+            text_lower = text.lower()
         if "premium" in text_lower or "75" in text_lower:
             return "premium"
         if "growth" in text_lower or "35" in text_lower:
@@ -206,6 +342,57 @@ class SalesAgentBrain:
 
     def generate_opening_message(self, lead: dict, channel: str = "call") -> str:
         """Generate the very first message for a cold outreach."""
+        return self._generate_cached(self._opening_prompt(lead, channel))
+
+    async def agenerate_opening_message(self, lead: dict, channel: str = "call") -> str:
+        return await self._agenerate_cached(self._opening_prompt(lead, channel))
+
+    def generate_followup(self, lead: dict, followup_number: int, channel: str = "email") -> str:
+        """Generate follow-up message (Day 2, Day 5, Day 10)."""
+        return self._generate_cached(self._followup_prompt(lead, followup_number, channel))
+
+    async def agenerate_followup(self, lead: dict, followup_number: int, channel: str = "email") -> str:
+        return await self._agenerate_cached(self._followup_prompt(lead, followup_number, channel))
+
+    def _generate_cached(self, prompt: str) -> str:
+        """One-shot generation, reusing the previous result for an identical prompt."""
+        text = self._gen_cache_get(prompt)
+        if text is None:
+            text = self.llm.invoke([HumanMessage(content=prompt)]).content
+            self._gen_cache_put(prompt, text)
+        return text
+
+    async def _agenerate_cached(self, prompt: str) -> str:
+        text = self._gen_cache_get(prompt)
+        if text is None:
+            text = (await self._ainvoke([HumanMessage(content=prompt)])).content
+            self._gen_cache_put(prompt, text)
+        return text
+
+    def _gen_cache_get(self, prompt: str) -> Optional[str]:
+        with self._gen_cache_lock:
+            text = self._gen_cache.get(prompt)
+            if text is not None:
+                self._gen_cache.move_to_end(prompt)
+            return text
+
+    def _gen_cache_put(self, prompt: str, text: str):
+        with self._gen_cache_lock:
+            self._gen_cache[prompt] = text
+            self._gen_cache.move_to_end(prompt)
+            if len(self._gen_cache) > GENERATION_CACHE_SIZE:
+                self._gen_cache.popitem(last=False)
+
+    def handle_objection(self, lead: dict, objection: str) -> str:
+        """Specialized objection handler."""
+        msg = self.llm.invoke([HumanMessage(content=self._objection_prompt(lead, objection))])
+        return msg.content
+
+    async def ahandle_objection(self, lead: dict, objection: str) -> str:
+        msg = await self._ainvoke([HumanMessage(content=self._objection_prompt(lead, objection))])
+        return msg.content
+
+    def _opening_prompt(self, lead: dict, channel: str) -> str:
         pain = lead.get("pain_points", [])
         pain_str = pain[0] if pain else "limited online visibility"
         
@@ -214,30 +401,24 @@ class SalesAgentBrain:
             "email": f"Write a 3-paragraph cold email to {lead.get('name')} from {lead.get('website')}. Subject line + body. Their pain: {pain_str}. No fluff. Clear value.",
             "whatsapp": f"Write a short WhatsApp message (under 100 words) to {lead.get('name')} from {lead.get('website')}. Their pain: {pain_str}. Casual, no spam vibes.",
         }
-        
-        msg = self.llm.invoke([HumanMessage(content=prompts[channel])])
-        return msg.content
+        return prompts[channel]
 
-    def generate_followup(self, lead: dict, followup_number: int, channel: str = "email") -> str:
-        """Generate follow-up message (Day 2, Day 5, Day 10)."""
+    def _followup_prompt(self, lead: dict, followup_number: int, channel: str) -> str:
         context = {
             1: "They didn't respond to first outreach. Gentle nudge with new insight.",
             2: "Second follow-up. Add social proof or a case study mention.",
             3: "Final follow-up. Create urgency — limited slots this month."
         }
-        prompt = f"""
+        return f"""
         Generate follow-up #{followup_number} for {lead.get('name')} on {channel}.
         Context: {context.get(followup_number, context[3])}
         Their website: {lead.get('website')}
         Known pain points: {', '.join(lead.get('pain_points', []))}
         Channel tone: {'conversational call script' if channel == 'call' else 'professional ' + channel}
         """
-        msg = self.llm.invoke([HumanMessage(content=prompt)])
-        return msg.content
 
-    def handle_objection(self, lead: dict, objection: str) -> str:
-        """Specialized objection handler."""
-        prompt = f"""
+    def _objection_prompt(self, lead: dict, objection: str) -> str:
+        return f"""
         You are Aryan from DigitalBoost Agency.
         A prospect just said: "{objection}"
         Their context: {lead.get('name')}, e-commerce store at {lead.get('website')}, pain points: {lead.get('pain_points')}
@@ -245,26 +426,27 @@ class SalesAgentBrain:
         Respond to this objection in 2-3 sentences. Be empathetic, reframe, and move toward close.
         Don't be pushy. Use logic + social proof.
         """
-        msg = self.llm.invoke([HumanMessage(content=prompt)])
-        return msg.content
 
 
 # ── Quote Generator ───────────────────────────────────────────────────────────
+# Package-level quote fields, built once; generate() only adds the per-lead bits
+_PACKAGE_CACHE = {
+    key: {"package": p["name"], "price": p["price"], "currency": p["currency"], "includes": p["includes"]}
+    for key, p in SERVICE_PACKAGES.items()
+}
+
 class QuoteGenerator:
     def generate(self, lead: dict, package_key: str) -> dict:
         """Generate a structured quote for sending via email/DocuSign."""
-        package = SERVICE_PACKAGES.get(package_key, SERVICE_PACKAGES["growth"])
+        package = _PACKAGE_CACHE.get(package_key, _PACKAGE_CACHE["growth"])
         
         return {
             "client_name": lead.get("name"),
             "client_email": lead.get("email"),
             "client_website": lead.get("website"),
-            "package": package["name"],
-            "price": package["price"],
-            "currency": package["currency"],
-            "includes": package["includes"],
+            **package,
             "validity": "7 days",
-            "generated_at": __import__("datetime").datetime.utcnow().isoformat(),
+            "generated_at": datetime.now(timezone.utc).isoformat(),
             "payment_link": f"https://pay.stripe.com/your-link/{package_key}",  # replace with real Stripe link
         }
 
@@ -11,15 +11,26 @@ Features:
   - Inbound call support (prospects calling back)
 
 Setup:
-  pip install vapi-python fastapi uvicorn
+  pip install vapi-python fastapi uvicorn msgspec
   Set VAPI_API_KEY, VAPI_PHONE_NUMBER_ID in env
 """
 
 import os
-import json
+import time
+import asyncio
+import functools
+import hashlib
+import threading
+from collections import defaultdict
+import httpx
+import msgspec
+import orjson
 import requests
+import redis.asyncio as aioredis
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
 from fastapi import FastAPI, Request
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from module2_agent_brain import SalesAgentBrain, SERVICE_PACKAGES
 
 # ── Config ────────────────────────────────────────────────────────────────────
@@ -28,23 +39,24 @@ VAPI_PHONE_NUMBER_ID = os.getenv("VAPI_PHONE_NUMBER_ID")   # from Vapi dashboard
 OPENAI_API_KEY       = os.getenv("OPENAI_API_KEY")
 WEBHOOK_BASE_URL     = os.getenv("WEBHOOK_BASE_URL")        # e.g. https://yourserver.com
 
+REDIS_URL            = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+
 VAPI_BASE = "https://api.vapi.ai"
 HEADERS   = {"Authorization": f"Bearer {VAPI_API_KEY}", "Content-Type": "application/json"}
 
 
 # ── Vapi Assistant Config ─────────────────────────────────────────────────────
-def build_assistant_config(lead: dict) -> dict:
-    """
-    Builds the Vapi assistant configuration for a specific lead.
-    This defines the AI's voice, personality, and first message.
-    """
-    pain_points = ", ".join(lead.get("pain_points", [])) or "online visibility issues"
-    
-    system_prompt = f"""
-You are Aryan, a senior sales consultant at DigitalBoost Agency, calling {lead['name']} 
-about their e-commerce website at {lead.get('website', 'their store')}.
+# The assistant is identical for every lead except a few {{variables}} that Vapi
+# fills in per call from assistantOverrides.variableValues.
+VAPI_ASSISTANT_ID    = os.getenv("VAPI_ASSISTANT_ID") or None   # optional: pre-registered assistant
+_assistant_lock      = threading.Lock()
+_assistant_failed    = False   # registration failed once — stay on inline config
+
+BASE_SYSTEM_PROMPT = """
+You are Aryan, a senior sales consultant at DigitalBoost Agency, calling {{name}} 
+about their e-commerce website at {{website}}.
 
-You know their website has issues with: {pain_points}
+You know their website has issues with: {{pain_points}}
 
 Your goal: Have a natural conversation, uncover pain, pitch the right solution.
 
@@ -69,12 +81,18 @@ Available packages to pitch:
 - Premium (₹75,000/mo): Full rebuild + aggressive ads + CRO — for scaling stores
 """
 
+
+def build_base_assistant() -> dict:
+    """
+    Builds the lead-agnostic Vapi assistant configuration.
+    This defines the AI's voice, personality, and (templated) first message.
+    """
     return {
-        "name": f"Aryan - DigitalBoost - {lead['name']}",
+        "name": "Aryan - DigitalBoost",
         "model": {
             "provider": "openai",
             "model": "gpt-4o",
-            "systemPrompt": system_prompt,
+            "systemPrompt": BASE_SYSTEM_PROMPT,
             "temperature": 0.7,
         },
         "voice": {
@@ -83,7 +101,7 @@ Available packages to pitch:
             "stability": 0.5,
             "similarityBoost": 0.75,
         },
-        "firstMessage": f"Hi, is this {lead['name'].split()[0]}? This is Aryan calling from DigitalBoost Agency — do you have just 2 minutes?",
+        "firstMessage": "Hi, is this {{first_name}}? This is Aryan calling from DigitalBoost Agency — do you have just 2 minutes?",
         "transcriber": {
             "provider": "deepgram",
             "model": "nova-2",
@@ -97,36 +115,104 @@ Available packages to pitch:
     }
 
 
+@functools.lru_cache(maxsize=1024)
+def build_assistant_overrides(name: str, website: str, pain_points: tuple) -> dict:
+    """Per-lead variable values for the base assistant (memoized — treat as read-only)."""
+    return {
+        "variableValues": {
+            "name": name,
+            "first_name": name.split()[0] if name else "there",
+            "website": website or "their store",
+            "pain_points": ", ".join(pain_points) or "online visibility issues",
+        }
+    }
+
+
 # ── Vapi Call Manager ─────────────────────────────────────────────────────────
 class VapiCallManager:
 
+    def __init__(self):
+        # One pooled session for all Vapi calls — keeps TCP+TLS alive across a campaign.
+        # Retry's default allowed_methods excludes POST, so a call is never placed twice.
+        self.session = requests.Session()
+        adapter = HTTPAdapter(
+            pool_connections=10,
+            pool_maxsize=20,
+            max_retries=Retry(total=3, backoff_factor=0.3, status_forcelist=[429, 500, 502, 503, 504]),
+        )
+        self.session.mount("https://", adapter)
+        self.session.headers.update(HEADERS)
+
+    def _assistant_id(self) -> str | None:
+        """
+        ID of the base assistant — found by name in Vapi, or created there if missing
+        (unless VAPI_ASSISTANT_ID is set; do set it in production). None means fall
+        back to inline config. The lock keeps concurrent callers from registering duplicates, and a
+        failure is remembered so later calls don't retry the POST every time.
+        """
+        global VAPI_ASSISTANT_ID, _assistant_failed
+        if VAPI_ASSISTANT_ID or _assistant_failed:
+            return VAPI_ASSISTANT_ID
+        with _assistant_lock:
+            if VAPI_ASSISTANT_ID or _assistant_failed:
+                return VAPI_ASSISTANT_ID
+            try:
+                config = build_base_assistant()
+                # Reuse the assistant an earlier boot/worker registered instead of adding another
+                resp = self.session.get(f"{VAPI_BASE}/assistant", params={"limit": 100}, timeout=(5, 15))
+                resp.raise_for_status()
+                existing = next((a["id"] for a in resp.json() if a.get("name") == config["name"]), None)
+                if existing:
+                    # Push the current prompt/voice so a reused assistant doesn't run stale config
+                    resp = self.session.patch(f"{VAPI_BASE}/assistant/{existing}", json=config, timeout=(5, 30))
+                    resp.raise_for_status()
+                    VAPI_ASSISTANT_ID = existing
+                    print(f"🤖 Using existing Vapi assistant {VAPI_ASSISTANT_ID} — set VAPI_ASSISTANT_ID to skip the lookup")
+                else:
+                    resp = self.session.post(f"{VAPI_BASE}/assistant", json=config, timeout=(5, 30))
+                    resp.raise_for_status()
+                    VAPI_ASSISTANT_ID = resp.json()["id"]
+                    print(f"🤖 Registered Vapi assistant {VAPI_ASSISTANT_ID} — set VAPI_ASSISTANT_ID to reuse it")
+            except Exception as e:
+                _assistant_failed = True
+                print(f"  [Vapi] Assistant registration failed, sending inline config: {e}")
+        return VAPI_ASSISTANT_ID
+
     def make_outbound_call(self, lead: dict) -> dict:
         """Initiate an outbound AI call to a lead."""
+        payload = self._call_payload(lead)
+        resp = self.session.post(f"{VAPI_BASE}/call/phone", json=payload, timeout=(5, 30))
+        resp.raise_for_status()
+        
+        call_data = resp.json()
+        print(f"📞 Call initiated to {lead['name']} ({lead['phone']}) — Call ID: {call_data['id']}")
+        return call_data
+
+    def _call_payload(self, lead: dict) -> dict:
+        """Build the /call/phone request body for a lead."""
         if not lead.get("phone"):
             raise ValueError(f"No phone number for lead: {lead.get('name')}")
         
-        assistant_config = build_assistant_config(lead)
+        overrides = build_assistant_overrides(
+            lead.get("name", ""), lead.get("website", ""), tuple(lead.get("pain_points", []))
+        )
+        assistant_id = self._assistant_id()
+        assistant = {"assistantId": assistant_id} if assistant_id else {"assistant": build_base_assistant()}
         
-        payload = {
+        return {
             "phoneNumberId": VAPI_PHONE_NUMBER_ID,
             "customer": {
                 "number": lead["phone"],   # E.164 format: +919876543210
                 "name": lead.get("name", ""),
             },
-            "assistant": assistant_config,
+            **assistant,
+            "assistantOverrides": overrides,
             "metadata": {
                 "lead_email": lead.get("email"),
                 "lead_website": lead.get("website"),
                 "campaign": "ecommerce_outreach_v1"
             }
         }
-        
-        resp = requests.post(f"{VAPI_BASE}/call/phone", headers=HEADERS, json=payload)
-        resp.raise_for_status()
-        
-        call_data = resp.json()
-        print(f"📞 Call initiated to {lead['name']} ({lead['phone']}) — Call ID: {call_data['id']}")
-        return call_data
 
     def schedule_callback(self, lead: dict, scheduled_time: str) -> dict:
         """Schedule a callback at a specific time (ISO 8601 format)."""
@@ -141,7 +227,7 @@ class VapiCallManager:
 
     def get_call_transcript(self, call_id: str) -> dict:
         """Retrieve transcript + recording after a call ends."""
-        resp = requests.get(f"{VAPI_BASE}/call/{call_id}", headers=HEADERS)
+        resp = self.session.get(f"{VAPI_BASE}/call/{call_id}", timeout=(5, 30))
         resp.raise_for_status()
         call = resp.json()
         
@@ -154,33 +240,190 @@ class VapiCallManager:
             "cost": call.get("cost", 0),
         }
 
-    def run_bulk_campaign(self, leads: list[dict], delay_seconds: int = 60) -> list:
+    async def run_bulk_campaign(self, leads: list[dict], max_concurrent: int = 5,
+                                min_interval: float = 1.0) -> list:
         """
-        Call multiple leads with a delay between each call.
-        Recommended: 60s+ between calls to avoid spam flags.
+        Call multiple leads concurrently over one pooled HTTP/2 client.
+        At most `max_concurrent` Vapi requests are in flight, and call starts are
+        spaced at least `min_interval` seconds apart (raise it to avoid spam flags).
         """
-        import time
-        results = []
-        for i, lead in enumerate(leads):
+        await asyncio.to_thread(self._assistant_id)   # register once before fanning out
+        sem = asyncio.Semaphore(max_concurrent)
+        pacing = {"lock": asyncio.Lock(), "next_at": 0.0, "interval": min_interval}
+        
+        async with httpx.AsyncClient(
+            base_url=VAPI_BASE,
+            headers=HEADERS,
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20),
+            timeout=30.0,
+        ) as client:
+            return await asyncio.gather(*(
+                self._call_one(client, sem, pacing, lead, i, len(leads))
+                for i, lead in enumerate(leads)
+            ))
+
+    async def _call_one(self, client: httpx.AsyncClient, sem: asyncio.Semaphore,
+                        pacing: dict, lead: dict, i: int, total: int) -> dict:
+        """Place one campaign call, honouring the concurrency cap and start spacing."""
+        async with sem:
+            # Leaky bucket: reserve the next start slot, then wait for it
+            async with pacing["lock"]:
+                now = time.monotonic()
+                start_at = max(now, pacing["next_at"])
+                pacing["next_at"] = start_at + pacing["interval"]
+            await asyncio.sleep(start_at - now)
+            
             try:
-                print(f"\n[{i+1}/{len(leads)}] Calling {lead['name']}...")
-                result = self.make_outbound_call(lead)
-                results.append({"lead": lead["name"], "status": "called", "call_id": result["id"]})
+                print(f"\n[{i+1}/{total}] Calling {lead['name']}...")
+                resp = await client.post("/call/phone", json=self._call_payload(lead))
+                resp.raise_for_status()
+                call_data = resp.json()
+                print(f"📞 Call initiated to {lead['name']} ({lead['phone']}) — Call ID: {call_data['id']}")
+                return {"lead": lead["name"], "status": "called", "call_id": call_data["id"]}
             except Exception as e:
                 print(f"  ❌ Failed for {lead['name']}: {e}")
-                results.append({"lead": lead["name"], "status": "failed", "error": str(e)})
-            
-            if i < len(leads) - 1:
-                time.sleep(delay_seconds)
-        
-        return results
+                return {"lead": lead["name"], "status": "failed", "error": str(e)}
 
 
 # ── Webhook Server (FastAPI) ──────────────────────────────────────────────────
-app = FastAPI(title="AI Sales Agent - Vapi Webhook")
+app = FastAPI(title="AI Sales Agent - Vapi Webhook", default_response_class=ORJSONResponse)
+
+# Call sessions live in Redis so any worker/replica can serve any webhook event
+#   call:{id}             hash  {status}
+#   call:{id}:transcript  list  of JSON {"role", "text"}
+CALL_SESSION_TTL = 7200   # seconds — well past the 30 min max call length
+WEBHOOK_DEDUPE_TTL = 3600  # seconds — covers Vapi's retry window
+# Only fire-and-forget events with side effects are deduped. Transcripts are cheap
+# and high-volume; a redelivered function-call still needs its result, since Vapi
+# only retries when it never got the first one.
+DEDUPED_EVENTS = frozenset({"call-ended", "hang"})
+redis_pool   = aioredis.ConnectionPool.from_url(REDIS_URL, max_connections=50, decode_responses=True)
+redis_client = aioredis.Redis(connection_pool=redis_pool)
+
+def _session_key(call_id: str) -> str:
+    return f"call:{call_id}"
+
+def _transcript_key(call_id: str) -> str:
+    return f"call:{call_id}:transcript"
+
+# Transcript events arrive many times a second per call. Buffer them per worker
+# and flush every TRANSCRIPT_FLUSH_INTERVAL as one pipelined RPUSH per call.
+TRANSCRIPT_FLUSH_INTERVAL = 0.25   # seconds
+_transcript_buffer: defaultdict[str, list] = defaultdict(list)
+_flusher_task: asyncio.Task | None = None
+
+def _buffer_transcript(call_id: str, entry: bytes):
+    global _flusher_task
+    _transcript_buffer[call_id].append(entry)
+    if _flusher_task is None or _flusher_task.done():
+        _flusher_task = asyncio.create_task(_transcript_flusher())
+
+async def _flush_transcripts(call_ids: list[str] | None = None):
+    """Write buffered transcript entries (all, or just `call_ids`) in one pipeline."""
+    global _transcript_buffer
+    if call_ids is None:
+        pending, _transcript_buffer = _transcript_buffer, defaultdict(list)
+    else:
+        pending = {cid: _transcript_buffer.pop(cid) for cid in call_ids if cid in _transcript_buffer}
+    if not pending:
+        return
+    try:
+        async with redis_client.pipeline(transaction=False) as pipe:
+            for cid, items in pending.items():
+                pipe.rpush(_transcript_key(cid), *items)
+                pipe.expire(_transcript_key(cid), CALL_SESSION_TTL)
+            await pipe.execute()
+    except Exception:
+        for cid, items in pending.items():   # keep order, retry next tick
+            _transcript_buffer[cid][:0] = items
+        raise
+
+async def _transcript_flusher():
+    while True:
+        await asyncio.sleep(TRANSCRIPT_FLUSH_INTERVAL)
+        try:
+            await _flush_transcripts()
+        except Exception as e:
+            print(f"  [Redis] Transcript flush failed, will retry: {e}")
+
+@app.on_event("shutdown")
+async def stop_transcript_flusher():
+    if _flusher_task is not None:
+        _flusher_task.cancel()
+    await _flush_transcripts()
+
+# One keep-alive client for every outbound webhook POST (n8n etc.)
+_httpx_client: httpx.AsyncClient | None = None
+
+@app.on_event("startup")
+async def init_http_client():
+    global _httpx_client
+    if _httpx_client is None:
+        _httpx_client = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100),
+        )
+
+# Strong refs to fire-and-forget tasks (the loop only keeps weak ones)
+_background_tasks: set[asyncio.Task] = set()
+
+def _spawn(coro) -> asyncio.Task:
+    task = asyncio.create_task(coro)
+    _background_tasks.add(task)
+    task.add_done_callback(_on_background_done)
+    return task
+
+def _on_background_done(task: asyncio.Task):
+    _background_tasks.discard(task)
+    if not task.cancelled() and task.exception() is not None:
+        print(f"  [Background] {task.get_coro().__qualname__} failed: {task.exception()!r}")
+
+@app.on_event("shutdown")
+async def close_http_client():
+    global _httpx_client
+    # Let in-flight post-call work finish before its client goes away
+    if _background_tasks:
+        await asyncio.gather(*_background_tasks, return_exceptions=True)
+    if _httpx_client is not None:
+        await _httpx_client.aclose()
+        _httpx_client = None
+
+# Webhook payload — decoded straight from bytes; fields we don't read are skipped.
+# Vapi sends explicit nulls for fields that don't apply to an event, so every
+# field is optional.
+class VapiCall(msgspec.Struct):
+    id: str | None = None
+    duration: float | None = None
+
+
+class VapiMessage(msgspec.Struct):
+    type: str | None = None
+    call: VapiCall | None = None
+    timestamp: int | float | str | None = None
+    role: str | None = None
+    transcript: str | None = None
+    endedReason: str | None = None
+    functionCall: dict | None = None
+
+
+class VapiEvent(msgspec.Struct):
+    message: VapiMessage | None = None
+
+
+async def _first_delivery(call_id: str, event_type: str, timestamp) -> bool:
+    """
+    SET NX on a digest of (call, event, timestamp) — True only the first time.
+    Events without a timestamp can't be told apart, so they always pass.
+    """
+    if timestamp is None:
+        return True
+    digest = hashlib.blake2b(
+        orjson.dumps({"c": call_id, "t": event_type, "ts": timestamp}), digest_size=16
+    ).hexdigest()
+    return bool(await redis_client.set(f"vapi:evt:{digest}", "1", nx=True, ex=WEBHOOK_DEDUPE_TTL))
 
-# In-memory store (replace with DB in production)
-call_sessions = {}
 
 @app.post("/vapi/webhook")
 async def vapi_webhook(request: Request):
@@ -192,51 +435,58 @@ async def vapi_webhook(request: Request):
       - call-ended
       - hang (prospect hung up)
     """
-    body = await request.json()
-    event_type = body.get("message", {}).get("type")
-    call_id    = body.get("message", {}).get("call", {}).get("id", "")
+    try:
+        evt = msgspec.json.decode(await request.body(), type=VapiEvent)
+    except (msgspec.ValidationError, msgspec.DecodeError) as e:
+        # 4xx so Vapi doesn't keep retrying a payload we'll never parse
+        return ORJSONResponse({"status": "invalid", "error": str(e)}, status_code=400)
+    msg = evt.message
+    if msg is None or not msg.type:
+        return {"status": "ignored"}
+    event_type = msg.type
+    call_id    = msg.call.id if msg.call and msg.call.id else ""
     
     print(f"[Webhook] Event: {event_type} | Call: {call_id}")
 
+    # Vapi retries on timeouts/non-2xx — drop redeliveries before they reach the CRM / n8n
+    if event_type in DEDUPED_EVENTS and not await _first_delivery(call_id, event_type, msg.timestamp):
+        return {"status": "duplicate"}
+
     if event_type == "call-started":
-        call_sessions[call_id] = {"status": "active", "transcript": []}
-        return JSONResponse({"status": "ok"})
+        await redis_client.hset(_session_key(call_id), mapping={"status": "active"})
+        await redis_client.expire(_session_key(call_id), CALL_SESSION_TTL)
+        return {"status": "ok"}
 
     elif event_type == "transcript":
-        msg = body["message"]
-        role = msg.get("role")       # "user" or "assistant"
-        text = msg.get("transcript", "")
-        
-        if call_id in call_sessions:
-            call_sessions[call_id]["transcript"].append({"role": role, "text": text})
-        
-        return JSONResponse({"status": "ok"})
+        # msg.role is "user" or "assistant"
+        if not msg.transcript:
+            return {"status": "ignored"}
+        _buffer_transcript(call_id, orjson.dumps({"role": msg.role, "text": msg.transcript}))
+        return {"status": "ok"}
 
     elif event_type == "function-call":
         # Handle tool calls from the AI (e.g., "send_quote", "schedule_followup")
-        fn_name = body["message"].get("functionCall", {}).get("name")
-        fn_args = body["message"].get("functionCall", {}).get("parameters", {})
+        fn_call = msg.functionCall or {}
+        fn_name = fn_call.get("name")
+        fn_args = fn_call.get("parameters") or {}
         
         result = await handle_function_call(fn_name, fn_args, call_id)
-        return JSONResponse({"result": result})
+        return {"result": result}
 
     elif event_type == "call-ended":
-        reason = body["message"].get("endedReason", "")
-        duration = body["message"].get("call", {}).get("duration", 0)
+        print(f"[Call Ended] Reason: {msg.endedReason} | Duration: {msg.call.duration if msg.call else None}s")
         
-        print(f"[Call Ended] Reason: {reason} | Duration: {duration}s")
-        
-        # Update CRM + trigger follow-up workflow
-        await post_call_processing(call_id, body["message"])
-        return JSONResponse({"status": "ok"})
+        # Update CRM + trigger follow-up workflow — after we ack, Vapi only needs a 2xx
+        _spawn(post_call_processing(call_id, msg))
+        return {"status": "ok"}
 
     elif event_type == "hang":
         print(f"[Prospect Hung Up] Call: {call_id}")
         # Schedule follow-up
-        await post_call_processing(call_id, body["message"], hung_up=True)
-        return JSONResponse({"status": "ok"})
+        _spawn(post_call_processing(call_id, msg, hung_up=True))
+        return {"status": "ok"}
 
-    return JSONResponse({"status": "unhandled", "event": event_type})
+    return {"status": "unhandled", "event": event_type}
 
 
 async def handle_function_call(fn_name: str, fn_args: dict, call_id: str) -> str:
@@ -261,13 +511,21 @@ async def handle_function_call(fn_name: str, fn_args: dict, call_id: str) -> str
     return "Done"
 
 
-async def post_call_processing(call_id: str, call_data: dict, hung_up: bool = False):
-    """After call ends: save transcript, update CRM, trigger follow-up."""
-    import httpx
-    
-    # Get transcript from call session
-    session = call_sessions.get(call_id, {})
-    transcript = session.get("transcript", [])
+async def post_call_processing(call_id: str, call_data: VapiMessage, hung_up: bool = False):
+    """
+    After call ends: save transcript, update CRM, trigger follow-up.
+    Runs as a background task — keep blocking/CPU-heavy work (e.g. GPT
+    summarization) behind `await asyncio.to_thread(...)`.
+    """
+    # Get transcript from call session — flush our buffer, then give other
+    # workers' flushers one interval to land their entries for this call
+    try:
+        await _flush_transcripts([call_id])
+        await asyncio.sleep(TRANSCRIPT_FLUSH_INTERVAL)
+        transcript = [orjson.loads(t) for t in await redis_client.lrange(_transcript_key(call_id), 0, -1)]
+    except Exception as e:
+        print(f"  [Post-Call] Couldn't load transcript for {call_id}: {e}")
+        transcript = []
     
     # Extract outcome using GPT (quick summarization)
     if transcript:
@@ -278,12 +536,21 @@ async def post_call_processing(call_id: str, call_data: dict, hung_up: bool = Fa
     # Trigger n8n follow-up workflow via webhook
     n8n_webhook = os.getenv("N8N_FOLLOWUP_WEBHOOK_URL")
     if n8n_webhook:
-        async with httpx.AsyncClient() as client:
-            await client.post(n8n_webhook, json={
+        await init_http_client()   # no-op once started
+        try:
+            resp = await _httpx_client.post(n8n_webhook, json={
                 "call_id": call_id,
                 "outcome": "hung_up" if hung_up else "completed",
                 "transcript": transcript
             })
+            resp.raise_for_status()
+        except Exception as e:
+            print(f"  [Post-Call] n8n webhook failed for {call_id}: {e}")
+    
+    try:
+        await redis_client.delete(_session_key(call_id), _transcript_key(call_id))
+    except Exception as e:   # keys expire after CALL_SESSION_TTL anyway
+        print(f"  [Post-Call] Couldn't clear session for {call_id}: {e}")
 
 
 # ── Entry Point ───────────────────────────────────────────────────────────────
@@ -295,4 +562,14 @@ if __name__ == "__main__":
     print("Expose with: ngrok http 8000")
     print("Set WEBHOOK_BASE_URL=https://your-ngrok-url.ngrok.io")
     
-    uvicorn.run(app, host="0.0.0.0", port=8000)
+    # Multi-worker is safe: call sessions live in Redis, not process memory
+    uvicorn.run(
+        "module3_voice_agent:app",
+        host="0.0.0.0",
+        port=8000,
+        loop="uvloop",
+        http="httptools",
+        workers=int(os.getenv("WEB_CONCURRENCY", "4")),
+        log_level="warning",
+        access_log=False,
+    )
@@ -8,17 +8,27 @@ Handles all written communication channels:
   - Quote emails with PDF attachment
   - Email open/click tracking
 
-pip install sendgrid twilio jinja2
+Twilio sends from async callers go through an arq queue (Redis); run the worker with:
+  arq module4_outreach.WorkerSettings
+
+pip install sendgrid twilio jinja2 httpx[http2] arq
 """
 
 import os
+import asyncio
+import sqlite3
+import httpx
+import jinja2
 from datetime import datetime
+from arq import create_pool, Retry
+from arq.connections import RedisSettings
 from sendgrid import SendGridAPIClient
-from sendgrid.helpers.mail import Mail, Attachment, FileContent, FileName, FileType, Disposition
+from sendgrid.helpers.mail import Attachment, FileContent, FileName, FileType, Disposition
 from twilio.rest import Client as TwilioClient
+from twilio.base.exceptions import TwilioRestException
 from module2_agent_brain import SalesAgentBrain, QuoteGenerator
 import base64
-import json
+import orjson
 
 # ── Config ────────────────────────────────────────────────────────────────────
 SENDGRID_API_KEY      = os.getenv("SENDGRID_API_KEY")
@@ -30,74 +40,99 @@ TWILIO_AUTH_TOKEN     = os.getenv("TWILIO_AUTH_TOKEN")
 TWILIO_PHONE_NUMBER   = os.getenv("TWILIO_PHONE_NUMBER")      # +1XXXXXXXXXX (Twilio SMS)
 TWILIO_WHATSAPP_FROM  = os.getenv("TWILIO_WHATSAPP_FROM")     # whatsapp:+14155238886 (Sandbox or approved)
 
+REDIS_URL             = os.getenv("REDIS_URL", "redis://localhost:6379/0")
+OUTREACH_QUEUE        = "outreach"
+TWILIO_MAX_TRIES      = 5
+
+LEADS_DB              = os.getenv("LEADS_DB", "leads.db")   # written by Module 5's LeadStateManager
+TEMPLATES_DIR         = os.path.join(os.path.dirname(os.path.abspath(__file__)), "templates")
+
 
 # ── Email Manager ─────────────────────────────────────────────────────────────
 class EmailManager:
     def __init__(self):
         self.sg = SendGridAPIClient(SENDGRID_API_KEY)
+        self._qg = QuoteGenerator()
+        # Async path talks to the SendGrid REST API directly over one pooled client
+        self._http = httpx.AsyncClient(
+            base_url="https://api.sendgrid.com",
+            headers={"Authorization": f"Bearer {SENDGRID_API_KEY}"},
+            http2=True,
+            limits=httpx.Limits(max_keepalive_connections=20),
+            timeout=15.0,
+        )
         self.agent_brain = SalesAgentBrain()
+        # Templates compile once; autoescape keeps lead/LLM text out of the markup
+        self.env = jinja2.Environment(
+            loader=jinja2.FileSystemLoader(TEMPLATES_DIR),
+            autoescape=True, trim_blocks=True, lstrip_blocks=True,
+        )
+        self._quote_tpl = self.env.get_template("quote.html")
+        self._text_tpl  = self.env.get_template("email_text.html")
 
     def send_cold_email(self, lead: dict) -> bool:
         """Send a personalized cold outreach email."""
         content = self.agent_brain.generate_opening_message(lead, channel="email")
-        
+        return self._send(**self._cold_email(lead, content))
+
+    def send_quote_email(self, lead: dict, package_key: str) -> bool:
+        """Send a professional quote email with pricing details."""
+        return self._send(**self._quote_email(lead, package_key))
+
+    def send_followup_email(self, lead: dict, followup_number: int) -> bool:
+        """Send a follow-up email (Day 2 / Day 5 / Day 10)."""
+        content = self.agent_brain.generate_followup(lead, followup_number, channel="email")
+        return self._send(**self._followup_email(lead, followup_number, content))
+
+    # ── Async variants: async LLM + pooled httpx client to SendGrid ──
+    async def asend_cold_email(self, lead: dict) -> bool:
+        content = await self.agent_brain.agenerate_opening_message(lead, channel="email")
+        return await self._asend(**self._cold_email(lead, content))
+
+    async def asend_quote_email(self, lead: dict, package_key: str) -> bool:
+        return await self._asend(**self._quote_email(lead, package_key))
+
+    async def asend_followup_email(self, lead: dict, followup_number: int) -> bool:
+        content = await self.agent_brain.agenerate_followup(lead, followup_number, channel="email")
+        return await self._asend(**self._followup_email(lead, followup_number, content))
+
+    async def aclose(self):
+        await self._http.aclose()
+
+    # ── Message builders (→ kwargs for _send / _asend) ──
+    def _cold_email(self, lead: dict, content: str) -> dict:
         # Split subject from body (GPT returns "Subject: ...\n\nBody...")
-        lines = content.strip().split("\n")
-        subject = ""
-        body_lines = []
-        
-        for i, line in enumerate(lines):
-            if line.lower().startswith("subject:"):
-                subject = line.replace("Subject:", "").replace("subject:", "").strip()
-            else:
-                body_lines.append(line)
-        
+        subject, body = self._split_subject(content)
         if not subject:
             subject = f"Quick question about {lead.get('website', 'your store')}"
         
-        body_html = self._text_to_html("\n".join(body_lines))
-        
-        return self._send(
+        return dict(
             to_email=lead["email"],
             to_name=lead.get("name", ""),
             subject=subject,
-            html_content=body_html,
+            html_content=self._text_to_html(body),
             lead_id=lead.get("email"),
             email_type="cold_outreach"
         )
 
-    def send_quote_email(self, lead: dict, package_key: str) -> bool:
-        """Send a professional quote email with pricing details."""
-        qg = QuoteGenerator()
-        quote = qg.generate(lead, package_key)
-        
-        subject = f"Your Custom Growth Proposal — {quote['package']}"
-        html = self._build_quote_html(quote, lead)
+    def _quote_email(self, lead: dict, package_key: str) -> dict:
+        quote = self._qg.generate(lead, package_key)
         
-        return self._send(
+        return dict(
             to_email=lead["email"],
             to_name=lead.get("name", ""),
-            subject=subject,
-            html_content=html,
+            subject=f"Your Custom Growth Proposal — {quote['package']}",
+            html_content=self._build_quote_html(quote, lead),
             lead_id=lead.get("email"),
             email_type="quote"
         )
 
-    def send_followup_email(self, lead: dict, followup_number: int) -> bool:
-        """Send a follow-up email (Day 2 / Day 5 / Day 10)."""
-        content = self.agent_brain.generate_followup(lead, followup_number, channel="email")
-        
-        lines = content.strip().split("\n")
-        subject = f"Re: Your e-commerce growth — follow-up #{followup_number}"
-        body = "\n".join(lines)
-        
-        for line in lines:
-            if line.lower().startswith("subject:"):
-                subject = line.split(":", 1)[1].strip()
-                body = "\n".join([l for l in lines if not l.lower().startswith("subject:")])
-                break
+    def _followup_email(self, lead: dict, followup_number: int, content: str) -> dict:
+        subject, body = self._split_subject(content)
+        if not subject:
+            subject = f"Re: Your e-commerce growth — follow-up #{followup_number}"
         
-        return self._send(
+        return dict(
             to_email=lead["email"],
             to_name=lead.get("name", ""),
             subject=subject,
@@ -106,20 +141,50 @@ class EmailManager:
             email_type=f"followup_{followup_number}"
         )
 
+    @staticmethod
+    def _split_subject(content: str) -> tuple[str, str]:
+        """Single pass: pull the first "Subject:" line out, keep the rest as body."""
+        subject = ""
+        body_lines = []
+        for line in content.strip().split("\n"):
+            if not subject and line[:8].lower() == "subject:":
+                subject = line[8:].strip()
+            else:
+                body_lines.append(line)
+        return subject, "\n".join(body_lines)
+
+    @staticmethod
+    def _mail_payload(to_email: str, to_name: str, subject: str,
+                      html_content: str, lead_id: str = "", email_type: str = "") -> dict:
+        """SendGrid v3 /mail/send body, with tracking category + custom args for analytics."""
+        to = {"email": to_email}
+        if to_name:
+            to["name"] = to_name
+        return {
+            "personalizations": [{"to": [to]}],
+            "from": {"email": SENDGRID_FROM_EMAIL, "name": SENDGRID_FROM_NAME},
+            "subject": subject,
+            "content": [{"type": "text/html", "value": html_content}],
+            "categories": [email_type],
+            "custom_args": {"lead_id": lead_id or "", "email_type": email_type},
+        }
+
     def _send(self, to_email: str, to_name: str, subject: str,
               html_content: str, lead_id: str = "", email_type: str = "") -> bool:
-        message = Mail(
-            from_email=(SENDGRID_FROM_EMAIL, SENDGRID_FROM_NAME),
-            to_emails=[(to_email, to_name)],
-            subject=subject,
-            html_content=html_content
-        )
-        # Add tracking category for analytics
-        message.category = [email_type]
-        message.custom_arg = {"lead_id": lead_id, "email_type": email_type}
-        
+        payload = self._mail_payload(to_email, to_name, subject, html_content, lead_id, email_type)
+        try:
+            response = self.sg.client.mail.send.post(request_body=payload)
+            print(f"  [Email] Sent '{email_type}' to {to_email} — Status: {response.status_code}")
+            return response.status_code in (200, 201, 202)
+        except Exception as e:
+            print(f"  [Email] Failed to send to {to_email}: {e}")
+            return False
+
+    async def _asend(self, to_email: str, to_name: str, subject: str,
+                     html_content: str, lead_id: str = "", email_type: str = "") -> bool:
+        payload = self._mail_payload(to_email, to_name, subject, html_content, lead_id, email_type)
         try:
-            response = self.sg.send(message)
+            response = await self._http.post("/v3/mail/send", json=payload)
             print(f"  [Email] Sent '{email_type}' to {to_email} — Status: {response.status_code}")
             return response.status_code in (200, 201, 202)
         except Exception as e:
@@ -128,49 +193,12 @@ class EmailManager:
 
     def _text_to_html(self, text: str) -> str:
         """Convert plain text to clean HTML email."""
-        paragraphs = [p for p in text.split("\n\n") if p.strip()]
-        html_parts = ["<div style='font-family: Arial, sans-serif; font-size: 15px; line-height: 1.6; color: #333; max-width: 600px;'>"]
-        for p in paragraphs:
-            html_parts.append(f"<p>{p.replace(chr(10), '<br>')}</p>")
-        html_parts.append("""
-            <hr style='border: none; border-top: 1px solid #eee; margin-top: 24px;'>
-            <p style='font-size: 13px; color: #888;'>
-                Aryan | Senior Sales Consultant<br>
-                DigitalBoost Agency | Website & SEO for E-Commerce<br>
-                <a href='mailto:aryan@digitalboost.in'>aryan@digitalboost.in</a>
-            </p>
-        """)
-        html_parts.append("</div>")
-        return "".join(html_parts)
+        paragraphs = [p.split("\n") for p in text.split("\n\n") if p.strip()]
+        return self._text_tpl.render(paragraphs=paragraphs)
 
     def _build_quote_html(self, quote: dict, lead: dict) -> str:
-        includes_html = "".join([f"<li>✓ {item}</li>" for item in quote["includes"]])
-        return f"""
-        <div style='font-family: Arial, sans-serif; max-width: 640px; color: #222;'>
-          <h2 style='color: #4f46e5;'>Your Custom Growth Proposal</h2>
-          <p>Hi {lead.get('name', '').split()[0]},</p>
-          <p>As discussed, here's your tailored proposal for <strong>{lead.get('website')}</strong>:</p>
-          
-          <div style='background: #f5f3ff; border-left: 4px solid #4f46e5; padding: 20px; border-radius: 8px; margin: 20px 0;'>
-            <h3 style='margin: 0 0 8px; color: #4f46e5;'>{quote['package']}</h3>
-            <p style='font-size: 28px; font-weight: bold; margin: 0;'>₹{quote['price']:,}<span style='font-size: 14px; font-weight: normal;'>/month</span></p>
-          </div>
-          
-          <h4>What's included:</h4>
-          <ul style='line-height: 2;'>{includes_html}</ul>
-          
-          <p><strong>Valid for:</strong> {quote['validity']}</p>
-          
-          <a href='{quote['payment_link']}' style='background: #4f46e5; color: white; padding: 14px 28px; border-radius: 8px; text-decoration: none; font-size: 16px; display: inline-block; margin: 16px 0;'>
-            Accept & Pay Now →
-          </a>
-          
-          <p style='font-size: 13px; color: #666;'>Questions? Just reply to this email or call/WhatsApp me directly.</p>
-          
-          <hr style='border: none; border-top: 1px solid #eee; margin-top: 24px;'>
-          <p style='font-size: 13px; color: #888;'>Aryan | DigitalBoost Agency</p>
-        </div>
-        """
+        name = lead.get("name") or ""
+        return self._quote_tpl.render(quote=quote, lead=lead, first_name=name.split()[0] if name else "there")
 
 
 # ── WhatsApp + SMS Manager ────────────────────────────────────────────────────
@@ -178,6 +206,10 @@ class WhatsAppManager:
     def __init__(self):
         self.client = TwilioClient(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
         self.agent_brain = SalesAgentBrain()
+        self._qg = QuoteGenerator()
+        self._queue = None              # arq pool, opened on first enqueue
+        self._queue_lock = asyncio.Lock()
+        self._leads_db = sqlite3.connect(LEADS_DB, check_same_thread=False)
 
     def send_cold_whatsapp(self, lead: dict) -> bool:
         """Send first WhatsApp message."""
@@ -191,22 +223,23 @@ class WhatsAppManager:
 
     def send_quote_whatsapp(self, lead: dict, package_key: str) -> bool:
         """Send a short quote summary over WhatsApp with payment link."""
-        from module2_agent_brain import QuoteGenerator, SERVICE_PACKAGES
-        qg = QuoteGenerator()
-        quote = qg.generate(lead, package_key)
-        pkg = SERVICE_PACKAGES.get(package_key, {})
+        return self._send_whatsapp(lead["phone"], self._quote_message(lead, package_key))
+
+    def _quote_message(self, lead: dict, package_key: str) -> str:
+        quote = self._qg.generate(lead, package_key)
+        name = lead.get("name")
+        first_name = name.split()[0] if name else "there"
+        includes_block = "\n".join(f"✅ {item}" for item in quote["includes"])
         
-        message = (
-            f"Hi {lead.get('name', '').split()[0]}! 👋\n\n"
+        return (
+            f"Hi {first_name}! 👋\n\n"
             f"Here's your proposal:\n\n"
             f"📦 *{quote['package']}*\n"
             f"💰 ₹{quote['price']:,}/month\n\n"
-            f"Includes:\n" +
-            "\n".join([f"✅ {item}" for item in quote["includes"]]) +
-            f"\n\n🔗 To proceed: {quote['payment_link']}\n\n"
+            f"Includes:\n{includes_block}\n\n"
+            f"🔗 To proceed: {quote['payment_link']}\n\n"
             f"Valid for 7 days. Any questions? Just reply here! 🙏"
         )
-        return self._send_whatsapp(lead["phone"], message)
 
     def send_sms(self, lead: dict, message: str) -> bool:
         """Send SMS as fallback."""
@@ -236,6 +269,43 @@ class WhatsAppManager:
             print(f"  [WhatsApp] Failed to {phone}: {e}")
             return False
 
+    # ── Async variants: enqueue for the arq worker and return immediately ──
+    async def asend_cold_whatsapp(self, lead: dict) -> bool:
+        message = await self.agent_brain.agenerate_opening_message(lead, channel="whatsapp")
+        return await self.asend_whatsapp(lead["phone"], message)
+
+    async def asend_followup_whatsapp(self, lead: dict, followup_number: int) -> bool:
+        message = await self.agent_brain.agenerate_followup(lead, followup_number, channel="whatsapp")
+        return await self.asend_whatsapp(lead["phone"], message)
+
+    async def asend_quote_whatsapp(self, lead: dict, package_key: str) -> bool:
+        return await self.asend_whatsapp(lead["phone"], self._quote_message(lead, package_key))
+
+    async def asend_sms(self, lead: dict, message: str) -> bool:
+        return await self._enqueue("_send_sms_task", lead["phone"], message)
+
+    async def asend_whatsapp(self, phone: str, message: str) -> bool:
+        """Queue a WhatsApp send — True once the job is in Redis, not once Twilio accepts it."""
+        return await self._enqueue("_send_whatsapp_task", phone, message)
+
+    async def _enqueue(self, task: str, phone: str, message: str) -> bool:
+        try:
+            if self._queue is None:
+                async with self._queue_lock:
+                    if self._queue is None:
+                        self._queue = await create_pool(
+                            RedisSettings.from_dsn(REDIS_URL), default_queue_name=OUTREACH_QUEUE
+                        )
+            await self._queue.enqueue_job(task, phone, message)
+            return True
+        except Exception as e:
+            print(f"  [Queue] Failed to enqueue {task} for {phone}: {e}")
+            return False
+
+    async def aclose(self):
+        if self._queue is not None:
+            await self._queue.aclose()
+
     def handle_inbound_whatsapp(self, from_number: str, message_body: str) -> str:
         """
         Handle incoming WhatsApp replies.
@@ -250,17 +320,83 @@ class WhatsAppManager:
         result = self.agent_brain.chat(lead, message_body, channel="whatsapp")
         return result["response"]
 
+    async def ahandle_inbound_whatsapp(self, from_number: str, message_body: str) -> str:
+        """
+        Async variant of `handle_inbound_whatsapp` — awaits the brain's non-blocking
+        `achat` on the event loop instead of tying up a thread for the LLM turn.
+        """
+        lead = self._find_lead_by_phone(from_number)
+        if not lead:
+            lead = {"name": "there", "phone": from_number, "pain_points": [], "stage": "new"}
+
+        result = await self.agent_brain.achat(lead, message_body, channel="whatsapp")
+        return result["response"]
+
     def _find_lead_by_phone(self, phone: str) -> dict | None:
-        """Look up lead from leads.json by phone."""
+        """Look up lead by phone — one indexed query against the leads DB (see Module 5)."""
+        bare = phone.lstrip("+")
         try:
-            with open("leads.json") as f:
-                leads = json.load(f)
-            for lead in leads:
-                if lead.get("phone") == phone or lead.get("phone") == phone.replace("+", ""):
-                    return lead
-        except FileNotFoundError:
-            pass
+            row = self._leads_db.execute(
+                "SELECT data FROM leads WHERE phone IN (?, ?) LIMIT 1", (bare, f"+{bare}")
+            ).fetchone()
+        except sqlite3.OperationalError:   # table not created yet
+            return None
+        return orjson.loads(row[0]) if row else None
+
+
+# ── Twilio send queue (arq worker) ────────────────────────────────────────────
+def _retry_backoff(job_try: int) -> float:
+    """Seconds before the next attempt: 2, 4, 8, 16… capped at a minute."""
+    return min(2 ** job_try, 60)
+
+
+async def _twilio_create(ctx, **kwargs):
+    """
+    One Twilio messages.create off the worker loop. Rate limits, 5xx and network
+    errors re-queue with backoff; any other 4xx (invalid number, unverified sandbox
+    recipient, …) won't succeed on retry, so it's logged and dropped — returns None.
+    """
+    try:
+        return await asyncio.to_thread(ctx["twilio"].messages.create, **kwargs)
+    except TwilioRestException as e:
+        if e.status != 429 and e.status < 500:
+            print(f"  [Queue] Twilio rejected message to {kwargs['to']} ({e.status}/{e.code}), dropping: {e.msg}")
+            return None
+        print(f"  [Queue] Twilio attempt {ctx['job_try']} failed for {kwargs['to']}: {e}")
+        raise Retry(defer=_retry_backoff(ctx["job_try"])) from e
+    except Exception as e:
+        print(f"  [Queue] Twilio attempt {ctx['job_try']} failed for {kwargs['to']}: {e}")
+        raise Retry(defer=_retry_backoff(ctx["job_try"])) from e
+
+
+async def _send_whatsapp_task(ctx, phone: str, message: str) -> str | None:
+    msg = await _twilio_create(ctx, body=message, from_=TWILIO_WHATSAPP_FROM, to=f"whatsapp:{phone}")
+    if msg is None:
+        return None
+    print(f"  [WhatsApp] Sent to {phone} — SID: {msg.sid}")
+    return msg.sid
+
+
+async def _send_sms_task(ctx, phone: str, message: str) -> str | None:
+    msg = await _twilio_create(ctx, body=message[:1600], from_=TWILIO_PHONE_NUMBER, to=phone)
+    if msg is None:
         return None
+    print(f"  [SMS] Sent to {phone} — SID: {msg.sid}")
+    return msg.sid
+
+
+async def _worker_startup(ctx):
+    ctx["twilio"] = TwilioClient(TWILIO_ACCOUNT_SID, TWILIO_AUTH_TOKEN)
+
+
+class WorkerSettings:
+    """`arq module4_outreach.WorkerSettings` — up to 8 Twilio sends in flight."""
+    functions      = [_send_whatsapp_task, _send_sms_task]
+    on_startup     = _worker_startup
+    redis_settings = RedisSettings.from_dsn(REDIS_URL)
+    queue_name     = OUTREACH_QUEUE
+    max_jobs       = 8
+    max_tries      = TWILIO_MAX_TRIES
 
 
 # ── Unified Outreach Orchestrator ─────────────────────────────────────────────
@@ -273,38 +409,59 @@ class OutreachOrchestrator:
         self.email_mgr  = EmailManager()
         self.wa_mgr     = WhatsAppManager()
 
-    def initial_outreach(self, lead: dict) -> dict:
+    # Channels are independent, so each lead's email + WhatsApp go out concurrently
+    async def ainitial_outreach(self, lead: dict) -> dict:
         """Send first contact across all available channels."""
-        results = {}
-        
-        # 1. Email (if available)
+        jobs = {}
         if lead.get("email"):
-            results["email"] = self.email_mgr.send_cold_email(lead)
-        
-        # 2. WhatsApp (if phone available)
+            jobs["email"] = self.email_mgr.asend_cold_email(lead)
         if lead.get("phone"):
-            results["whatsapp"] = self.wa_mgr.send_cold_whatsapp(lead)
+            jobs["whatsapp"] = self.wa_mgr.asend_cold_whatsapp(lead)
         
+        results = await self._gather_channels(lead, jobs)
         print(f"  [Outreach] {lead['name']} — {results}")
         return results
 
-    def send_quote(self, lead: dict, package_key: str) -> dict:
+    async def asend_quote(self, lead: dict, package_key: str) -> dict:
         """Send quote via email + WhatsApp."""
-        results = {}
+        jobs = {}
         if lead.get("email"):
-            results["email"] = self.email_mgr.send_quote_email(lead, package_key)
+            jobs["email"] = self.email_mgr.asend_quote_email(lead, package_key)
         if lead.get("phone"):
-            results["whatsapp"] = self.wa_mgr.send_quote_whatsapp(lead, package_key)
-        return results
+            jobs["whatsapp"] = self.wa_mgr.asend_quote_whatsapp(lead, package_key)
+        return await self._gather_channels(lead, jobs)
 
-    def send_followup(self, lead: dict, followup_number: int) -> dict:
+    async def asend_followup(self, lead: dict, followup_number: int) -> dict:
         """Send follow-up across channels."""
-        results = {}
+        jobs = {}
         if lead.get("email"):
-            results["email"] = self.email_mgr.send_followup_email(lead, followup_number)
+            jobs["email"] = self.email_mgr.asend_followup_email(lead, followup_number)
         if lead.get("phone"):
-            results["whatsapp"] = self.wa_mgr.send_followup_whatsapp(lead, followup_number)
-        return results
+            jobs["whatsapp"] = self.wa_mgr.asend_followup_whatsapp(lead, followup_number)
+        return await self._gather_channels(lead, jobs)
+
+    async def abulk_initial_outreach(self, leads: list[dict], max_concurrent: int = 10) -> list[dict]:
+        """Initial outreach for many leads, at most `max_concurrent` leads in flight."""
+        sem = asyncio.Semaphore(max_concurrent)
+        async def one(lead):
+            async with sem:
+                return await self.ainitial_outreach(lead)
+        return await asyncio.gather(*(one(lead) for lead in leads))
+
+    async def aclose(self):
+        await self.email_mgr.aclose()
+        await self.wa_mgr.aclose()
+
+    async def _gather_channels(self, lead: dict, jobs: dict) -> dict:
+        """Await per-channel sends together; a channel that raises is reported as False."""
+        results = await asyncio.gather(*jobs.values(), return_exceptions=True)
+        out = {}
+        for channel, result in zip(jobs, results):
+            if isinstance(result, Exception):
+                print(f"  [Outreach] {channel} failed for {lead.get('name')}: {result}")
+                result = False
+            out[channel] = result
+        return out
 
 
 # ── Quick Test ────────────────────────────────────────────────────────────────
@@ -322,5 +479,5 @@ if __name__ == "__main__":
     }
     
     print("=== Initial Outreach ===")
-    results = orchestrator.initial_outreach(test_lead)
+    results = asyncio.run(orchestrator.ainitial_outreach(test_lead))
     print(f"Results: {results}")
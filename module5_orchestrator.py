@@ -8,21 +8,30 @@ The main controller that runs the entire sales pipeline:
   4. Close deals → trigger onboarding
   5. Human handoff for edge cases
 
-Scheduler: APScheduler (runs as background process)
-pip install apscheduler httpx
+Scheduler: APScheduler AsyncIOScheduler (shares the event loop of whoever runs it)
+pip install apscheduler httpx stripe
 """
 
 import os
-import json
+import orjson
 import time
+import asyncio
+import functools
+import sqlite3
+import threading
+from contextlib import contextmanager
 import httpx
-from datetime import datetime, timedelta
+import stripe
+from datetime import date, datetime, timezone
 from typing import Optional
-from apscheduler.schedulers.background import BackgroundScheduler
+from apscheduler.jobstores.base import JobLookupError
+from apscheduler.jobstores.memory import MemoryJobStore
+from apscheduler.jobstores.sqlalchemy import SQLAlchemyJobStore
+from apscheduler.schedulers.asyncio import AsyncIOScheduler
 from apscheduler.triggers.date import DateTrigger
 from apscheduler.triggers.interval import IntervalTrigger
 
-from module2_agent_brain import SalesAgentBrain
+from module2_agent_brain import SalesAgentBrain, SERVICE_PACKAGES
 from module3_voice_agent import VapiCallManager
 from module4_outreach import OutreachOrchestrator
 
@@ -31,63 +40,290 @@ SLACK_WEBHOOK_URL     = os.getenv("SLACK_WEBHOOK_URL")      # for human alerts
 HUBSPOT_API_KEY       = os.getenv("HUBSPOT_API_KEY")
 DOCUSIGN_INTEGRATION_KEY = os.getenv("DOCUSIGN_INTEGRATION_KEY")
 STRIPE_SECRET_KEY     = os.getenv("STRIPE_SECRET_KEY")
+stripe.api_key        = STRIPE_SECRET_KEY
+
+LEADS_DB              = os.getenv("LEADS_DB", "leads.db")
 
 # Follow-up schedule (days after first contact)
 FOLLOWUP_SCHEDULE = [2, 5, 10]   # Day 2, Day 5, Day 10
+FOLLOWUP_STAGES   = ("contacted", "discovery", "qualified")
+
+# Outbound JSON bodies are pre-serialized with orjson (httpx's json= uses stdlib json)
+_JSON_HEADERS = {"Content-Type": "application/json"}
+
+# Package prices (₹/month) and the same in paise for Stripe — built once
+_PACKAGE_AMOUNT       = {key: p["price"] for key, p in SERVICE_PACKAGES.items()}
+_PACKAGE_AMOUNT_PAISE = {key: amount * 100 for key, amount in _PACKAGE_AMOUNT.items()}
+
+# PandaDoc contract: the static parts of every request, built once
+_PANDADOC_DOCUMENTS_URL = "https://api.pandadoc.com/public/v1/documents"
+_PANDADOC_HEADERS = {
+    "Authorization": f"API-Key {os.getenv('PANDADOC_API_KEY')}",
+    "Content-Type": "application/json"
+}
+_PANDADOC_SKELETON = {"template_uuid": os.getenv("PANDADOC_TEMPLATE_ID"), "send_immediately": True}
+_PACKAGE_CONTRACT_FIELDS = {
+    key: {"package_name": {"value": p["name"]}, "package_price": {"value": f"₹{p['price']:,}"}}
+    for key, p in SERVICE_PACKAGES.items()
+}
+_NO_PACKAGE_FIELDS = {"package_name": {"value": ""}, "package_price": {"value": "₹0"}}
+
+@functools.lru_cache(maxsize=1)
+def _human_date(day: date) -> str:
+    """"October 14, 2026" — strftime is locale-aware and slow; format each day once."""
+    return day.strftime("%B %d, %Y")
+
+# HubSpot batch/update takes up to 100 contacts; updates wait a few seconds to share a request
+HUBSPOT_BATCH_SIZE  = 100
+HUBSPOT_FLUSH_DELAY = 5.0
+HUBSPOT_MAX_TRIES   = 6       # per contact update, then it's dropped with an error
+HUBSPOT_MAX_BACKOFF = 300.0   # seconds — retry delay doubles per failed attempt up to this
+
+# Leads worked in parallel per scheduler tick (each slot still paces itself)
+OUTREACH_MAX_CONCURRENT = 10
 
 
 # ── Lead State Manager ────────────────────────────────────────────────────────
+# Leads live in SQLite: the full lead dict is the `data` JSON column, and the
+# fields we filter on are generated from it so they can be indexed and never drift.
+LEADS_SCHEMA = """
+CREATE TABLE IF NOT EXISTS leads (
+    id             TEXT PRIMARY KEY,            -- email, else phone
+    data           TEXT NOT NULL,               -- full lead as JSON
+    email          TEXT    GENERATED ALWAYS AS (json_extract(data, '$.email')) VIRTUAL,
+    phone          TEXT    GENERATED ALWAYS AS (json_extract(data, '$.phone')) VIRTUAL,
+    stage          TEXT    GENERATED ALWAYS AS (json_extract(data, '$.stage')) VIRTUAL,
+    created_at     TEXT    GENERATED ALWAYS AS (json_extract(data, '$.created_at')) VIRTUAL,
+    followup_count INTEGER GENERATED ALWAYS AS (coalesce(json_extract(data, '$.followup_count'), 0)) VIRTUAL
+);
+CREATE INDEX IF NOT EXISTS idx_email    ON leads(email);
+CREATE INDEX IF NOT EXISTS idx_phone    ON leads(phone);
+CREATE INDEX IF NOT EXISTS idx_stage    ON leads(stage);
+"""
+
+
+def _dumps(obj) -> str:
+    # orjson gives bytes; SQLite's JSON functions need TEXT, not BLOB
+    return orjson.dumps(obj).decode()
+
+
 class LeadStateManager:
-    """Manages lead pipeline state in leads.json (swap for DB in production)."""
+    """
+    Manages lead pipeline state in SQLite (leads.db).
+    leads.json (Module 1's output) is imported on startup; existing leads keep their state.
+    """
     
-    def __init__(self, filepath="leads.json"):
+    def __init__(self, db_path=LEADS_DB, filepath="leads.json"):
+        self.db_path = db_path
         self.filepath = filepath
+        # One connection shared by the API threadpool + scheduler jobs, serialized by a lock
+        self._lock = threading.RLock()
+        self._txn_depth = 0
+        self._conn = sqlite3.connect(db_path, check_same_thread=False)
+        self._conn.execute("PRAGMA journal_mode=WAL")
+        self._conn.execute("PRAGMA synchronous=NORMAL")
+        self._conn.executescript(LEADS_SCHEMA)
+        self._migrate_legacy_rows()
+        # Parsed leads keyed by id, reused until the DB version moves
+        self._leads_by_id: dict[str, dict] = {}
+        self._leads_version = None
+        self.import_json()
 
-    def load_all(self) -> list[dict]:
+    @staticmethod
+    def _lead_id(lead: dict) -> str:
+        lead_id = lead.get("email") or lead.get("phone")
+        if not lead_id:
+            raise ValueError("lead needs an email or phone")
+        return lead_id
+
+    def _on_ingest(self, lead: dict) -> dict:
+        """
+        Derive fields once, as the lead is stored, instead of on every use: the canonical
+        `id` (email, else phone — also the row key and job-id suffix), `created_at_ts`
+        (epoch seconds) from `created_at`, and `first_name`/`last_name` from `name`.
+        """
+        lead["id"] = self._lead_id(lead)
+        if "first_name" not in lead:
+            parts = (lead.get("name") or "").split()
+            lead["first_name"] = parts[0] if parts else ""
+            lead["last_name"] = " ".join(parts[1:])
+        if not lead.get("created_at_ts"):
+            created_at = lead.get("created_at")
+            lead["created_at_ts"] = int(time.time())
+            if created_at:
+                try:
+                    created = datetime.fromisoformat(created_at)
+                except (ValueError, TypeError):
+                    print(f"  [State] Bad created_at {created_at!r} on lead {lead['id']} — using now")
+                else:
+                    if created.tzinfo is None:   # stored as naive UTC
+                        created = created.replace(tzinfo=timezone.utc)
+                    lead["created_at_ts"] = int(created.timestamp())
+        return lead
+
+    def _migrate_legacy_rows(self):
+        """Run `_on_ingest` over rows stored before it existed (no id/first_name/created_at_ts)."""
+        rows = self._conn.execute(
+            "SELECT id, data FROM leads WHERE json_extract(data, '$.id') IS NULL"
+            " OR json_extract(data, '$.first_name') IS NULL"
+            " OR json_extract(data, '$.created_at_ts') IS NULL"
+        ).fetchall()
+        updates = []
+        for row_id, data in rows:
+            lead = orjson.loads(data)
+            try:
+                self._on_ingest(lead)
+            except ValueError:   # no email/phone
+                pass
+            lead["id"] = row_id   # the row key stays canonical
+            updates.append((_dumps(lead), row_id))
+        if updates:
+            with self._conn:
+                self._conn.executemany("UPDATE leads SET data = ? WHERE id = ?", updates)
+
+    @contextmanager
+    def transaction(self):
+        """
+        Group writes into one SQLite transaction — one commit, rolled back on error.
+        Nests (inner blocks join the outer one). Synchronous on purpose: never hold it
+        across an await, or the other process' writers stall on the DB lock.
+        """
+        with self._lock:
+            self._txn_depth += 1
+            try:
+                yield self._conn
+            except BaseException:
+                if self._txn_depth == 1:
+                    self._conn.rollback()
+                raise
+            else:
+                if self._txn_depth == 1:
+                    self._conn.commit()
+            finally:
+                self._txn_depth -= 1
+
+    def _query_rows(self, sql: str, params=()) -> list[tuple]:
+        with self._lock:
+            return self._conn.execute(sql, params).fetchall()
+
+    def _query(self, sql: str, params=()) -> list[dict]:
+        """Run a `SELECT data ...` and decode each row back into a lead dict."""
+        return [orjson.loads(row[0]) for row in self._query_rows(sql, params)]
+
+    def import_json(self, filepath: Optional[str] = None) -> int:
+        """Insert leads from a JSON array file that aren't in the DB yet. Returns rows added."""
         try:
-            with open(self.filepath) as f:
-                return json.load(f)
+            with open(filepath or self.filepath, "rb") as f:
+                leads = orjson.loads(f.read())
         except FileNotFoundError:
-            return []
+            return 0
+        leads = [self._on_ingest(l) for l in leads if l.get("email") or l.get("phone")]
+        rows = [(l["id"], _dumps(l)) for l in leads]
+        with self.transaction():
+            before = self._conn.total_changes
+            self._conn.executemany("INSERT INTO leads (id, data) VALUES (?, ?) ON CONFLICT(id) DO NOTHING", rows)
+            return self._conn.total_changes - before
+
+    def version(self) -> tuple[int, int]:
+        """Changes whenever any connection commits — cheap cache key for read-only views."""
+        with self._lock:
+            data_version = self._conn.execute("PRAGMA data_version").fetchone()[0]
+            return data_version, self._conn.total_changes
+
+    def load_all(self) -> list[dict]:
+        return list(self._snapshot().values())
+
+    def _snapshot(self) -> dict[str, dict]:
+        """All leads keyed by id — parsed once, then re-read only after a commit (ours or another process')."""
+        with self._lock:
+            version = self.version()
+            if version != self._leads_version:
+                rows = self._conn.execute("SELECT id, data FROM leads").fetchall()
+                self._leads_by_id = {lead_id: orjson.loads(data) for lead_id, data in rows}
+                self._leads_version = version
+            return self._leads_by_id
 
     def save_all(self, leads: list[dict]):
-        with open(self.filepath, "w") as f:
-            json.dump(leads, f, indent=2)
+        rows = [(l["id"], _dumps(l)) for l in map(self._on_ingest, leads)]
+        with self.transaction():
+            self._conn.execute("DELETE FROM leads")
+            self._conn.executemany("INSERT OR REPLACE INTO leads (id, data) VALUES (?, ?)", rows)
 
-    def update_lead(self, identifier: str, updates: dict):
-        leads = self.load_all()
-        for lead in leads:
-            if lead.get("email") == identifier or lead.get("phone") == identifier:
-                lead.update(updates)
-                break
-        self.save_all(leads)
-
-    def get_leads_by_stage(self, stage: str) -> list[dict]:
-        return [l for l in self.load_all() if l.get("stage") == stage]
-
-    def get_leads_needing_followup(self) -> list[dict]:
-        """Find leads due for follow-up based on schedule."""
-        now = datetime.utcnow()
-        overdue = []
-        
-        for lead in self.load_all():
-            if lead.get("stage") in ("contacted", "discovery", "qualified"):
-                created = datetime.fromisoformat(lead.get("created_at", now.isoformat()))
-                days_since = (now - created).days
-                followup_num = lead.get("followup_count", 0)
-                
-                # Check if a new follow-up is due
-                if followup_num < len(FOLLOWUP_SCHEDULE):
-                    if days_since >= FOLLOWUP_SCHEDULE[followup_num]:
-                        lead["_followup_number"] = followup_num + 1
-                        overdue.append(lead)
-        
-        return overdue
+    def append_one(self, lead: dict) -> bool:
+        """
+        Insert a single lead — one indexed write. An existing lead with the same id is
+        left untouched (its stage/history survive); returns False in that case.
+        Raises ValueError if the lead has neither email nor phone.
+        """
+        lead_id = self._on_ingest(lead)["id"]
+        with self.transaction():
+            cur = self._conn.execute(
+                "INSERT INTO leads (id, data) VALUES (?, ?) ON CONFLICT(id) DO NOTHING",
+                (lead_id, _dumps(lead)),
+            )
+            return cur.rowcount == 1
+
+    def update_lead(self, lead_id: str, updates: dict):
+        """
+        Merge `updates` into the lead with this id — one UPDATE via the PK. Resolve an
+        email/phone with `get` first; several leads can share a phone number.
+        """
+        with self.transaction():
+            self._conn.execute(
+                "UPDATE leads SET data = json_patch(data, ?) WHERE id = ?",
+                (_dumps(updates), lead_id),
+            )
+
+    def get(self, identifier: str) -> Optional[dict]:
+        """One lead by id, email or phone — a PK / index lookup instead of scanning every lead."""
+        rows = self._query(
+            "SELECT data FROM leads WHERE id = ? OR email = ? OR phone = ? LIMIT 1",
+            (identifier, identifier, identifier),
+        )
+        return rows[0] if rows else None
+
+    def get_leads_by_stage(self, *stages: str) -> list[dict]:
+        """Leads in any of `stages` — an idx_stage lookup, so cold/closed leads are never read."""
+        placeholders = ", ".join("?" * len(stages))
+        return self._query(f"SELECT data FROM leads WHERE stage IN ({placeholders})", stages)
+
+    def count_by_stage(self) -> dict[str, int]:
+        """{stage: n} straight off idx_stage — no lead JSON is decoded."""
+        return dict(self._query_rows("SELECT stage, count(*) FROM leads GROUP BY stage"))
+
+    def claim_followup(self, identifier: str, followup_number: int) -> Optional[dict]:
+        """
+        Atomically record follow-up #n as sent, if the lead is still in a follow-up stage
+        and #n is exactly the next one owed (#n-1 sent, #n not). Returns the updated lead,
+        or None when there's nothing to do — so two processes firing the same job can't both
+        send it, and a late #3 can't skip #2. The last follow-up also marks the lead cold in
+        the same write.
+        """
+        updates = {
+            "followup_count": followup_number,
+            f"followup_{followup_number}_at": datetime.now(timezone.utc).isoformat(),
+        }
+        if followup_number >= len(FOLLOWUP_SCHEDULE):
+            updates["stage"] = "cold"
+        with self.transaction():
+            row = self._conn.execute(
+                f"""
+                UPDATE leads SET data = json_patch(data, ?)
+                WHERE id = ? AND followup_count = ?
+                  AND stage IN ({", ".join("?" * len(FOLLOWUP_STAGES))})
+                RETURNING data
+                """,
+                (_dumps(updates), identifier, followup_number - 1, *FOLLOWUP_STAGES),
+            ).fetchone()
+        return orjson.loads(row[0]) if row else None
 
 
 # ── Human Handoff (Slack Alert) ───────────────────────────────────────────────
 class HumanHandoff:
-    def alert(self, lead: dict, reason: str, transcript: str = ""):
+    def __init__(self, http: httpx.AsyncClient):
+        self.http = http
+
+    async def alert(self, lead: dict, reason: str, transcript: str = ""):
         """Send Slack alert for human to take over."""
         if not SLACK_WEBHOOK_URL:
             print(f"[HUMAN HANDOFF NEEDED] {lead['name']} — Reason: {reason}")
@@ -108,8 +344,7 @@ class HumanHandoff:
             }]
         }
         try:
-            import httpx
-            httpx.post(SLACK_WEBHOOK_URL, json=payload)
+            await self.http.post(SLACK_WEBHOOK_URL, content=orjson.dumps(payload), headers=_JSON_HEADERS)
             print(f"  [Slack] Human handoff alert sent for {lead['name']}")
         except Exception as e:
             print(f"  [Slack] Alert failed: {e}")
@@ -119,26 +354,31 @@ class HumanHandoff:
 class DealCloser:
     """Handles everything after a lead says yes."""
 
-    def close_deal(self, lead: dict, package_key: str):
+    def __init__(self, http: httpx.AsyncClient, handoff: HumanHandoff):
+        self.http = http
+        self.handoff = handoff
+        # HubSpot updates coalesce per contact and go out in batches (see flush_hubspot)
+        self._hubspot_pending: dict[str, dict] = {}
+        self._hubspot_attempts: dict[str, int] = {}   # failed sends of each pending update
+        self._hubspot_flush: Optional[asyncio.Task] = None
+
+    async def close_deal(self, lead: dict, package_key: str):
         """Full closing sequence: send contract → take payment → trigger onboarding."""
         print(f"\n🎉 CLOSING DEAL: {lead['name']} — {package_key}")
         
-        # 1. Send contract via DocuSign (or PandaDoc)
-        contract_url = self._send_contract(lead, package_key)
+        # 1–4 hit independent vendors, so run them together:
+        # contract (PandaDoc) · payment link (Stripe) · "Closed Won" (HubSpot) · onboarding workflow
+        contract_url, payment_link, _, _ = await asyncio.gather(
+            self._send_contract(lead, package_key),
+            asyncio.to_thread(self._create_payment_link, package_key),
+            self._update_hubspot_stage(lead, "closedwon", package_key),
+            self._trigger_onboarding(lead, package_key),
+        )
         print(f"  [Contract] Sent to {lead['email']} — URL: {contract_url}")
-        
-        # 2. Send Stripe payment link
-        payment_link = self._create_payment_link(package_key)
         print(f"  [Payment] Stripe link: {payment_link}")
         
-        # 3. Update HubSpot to "Closed Won"
-        self._update_hubspot_stage(lead, "closedwon", package_key)
-        
-        # 4. Trigger onboarding workflow
-        self._trigger_onboarding(lead, package_key)
-        
         # 5. Notify team
-        HumanHandoff().alert(
+        await self.handoff.alert(
             lead,
             f"🎉 DEAL CLOSED — {package_key} package. Onboarding triggered.",
             transcript=""
@@ -146,40 +386,30 @@ class DealCloser:
         
         return {"status": "closed", "contract_url": contract_url, "payment_link": payment_link}
 
-    def _send_contract(self, lead: dict, package_key: str) -> str:
+    async def _send_contract(self, lead: dict, package_key: str) -> str:
         """
         Send contract via PandaDoc API.
         Replace with DocuSign if preferred.
         """
-        # PandaDoc API call
-        headers = {
-            "Authorization": f"API-Key {os.getenv('PANDADOC_API_KEY')}",
-            "Content-Type": "application/json"
-        }
-        from module2_agent_brain import SERVICE_PACKAGES
-        package = SERVICE_PACKAGES.get(package_key, {})
-        
-        payload = {
+        # PandaDoc API call — only the per-lead parts are built here
+        payload = _PANDADOC_SKELETON | {
             "name": f"Service Agreement — {lead['name']}",
-            "template_uuid": os.getenv("PANDADOC_TEMPLATE_ID"),
             "recipients": [{
                 "email": lead["email"],
-                "first_name": lead["name"].split()[0],
-                "last_name": " ".join(lead["name"].split()[1:]),
+                "first_name": lead.get("first_name", ""),
+                "last_name": lead.get("last_name", ""),
                 "role": "Client"
             }],
             "fields": {
                 "client_name": {"value": lead["name"]},
                 "client_website": {"value": lead.get("website", "")},
-                "package_name": {"value": package.get("name", "")},
-                "package_price": {"value": f"₹{package.get('price', 0):,}"},
-                "start_date": {"value": datetime.utcnow().strftime("%B %d, %Y")}
+                **_PACKAGE_CONTRACT_FIELDS.get(package_key, _NO_PACKAGE_FIELDS),
+                "start_date": {"value": _human_date(datetime.now(timezone.utc).date())}
             },
-            "send_immediately": True
         }
         
         try:
-            resp = httpx.post("https://api.pandadoc.com/public/v1/documents", headers=headers, json=payload)
+            resp = await self.http.post(_PANDADOC_DOCUMENTS_URL, headers=_PANDADOC_HEADERS, content=orjson.dumps(payload))
             return resp.json().get("public_preview_url", "Contract sent via email")
         except Exception as e:
             print(f"  [PandaDoc] Error: {e}")
@@ -187,19 +417,15 @@ class DealCloser:
 
     def _create_payment_link(self, package_key: str) -> str:
         """Create a Stripe payment link for the package."""
-        from module2_agent_brain import SERVICE_PACKAGES
         package = SERVICE_PACKAGES.get(package_key, {})
         
         try:
-            import stripe
-            stripe.api_key = STRIPE_SECRET_KEY
-            
             link = stripe.PaymentLink.create(
                 line_items=[{
                     "price_data": {
                         "currency": "inr",
                         "product_data": {"name": package.get("name", "")},
-                        "unit_amount": package.get("price", 0) * 100,  # paise
+                        "unit_amount": _PACKAGE_AMOUNT_PAISE.get(package_key, 0),
                         "recurring": {"interval": "month"}
                     },
                     "quantity": 1
@@ -210,32 +436,113 @@ class DealCloser:
             print(f"  [Stripe] Error: {e}")
             return f"https://pay.stripe.com/manual/{package_key}"
 
-    def _update_hubspot_stage(self, lead: dict, stage: str, package_key: str):
-        """Update deal stage in HubSpot."""
+    async def _update_hubspot_stage(self, lead: dict, stage: str, package_key: str):
+        """Queue a deal-stage update for HubSpot — sent with the next batch flush."""
+        self._hubspot_pending[lead.get("email")] = {
+            "dealstage": stage, "amount": str(_PACKAGE_AMOUNT.get(package_key, 0))
+        }
+        self._hubspot_attempts.pop(lead.get("email"), None)   # a fresh update starts over
+        if self._hubspot_flush is None or self._hubspot_flush.done():
+            self._hubspot_flush = asyncio.create_task(self._flush_hubspot_later())
+
+    async def _flush_hubspot_later(self, delay: float = HUBSPOT_FLUSH_DELAY):
+        await asyncio.sleep(delay)
+        self._hubspot_flush = None   # a retry re-queued by this flush gets its own timer
+        await self.flush_hubspot()
+
+    async def aclose(self):
+        """Send whatever is queued now; anything re-queued after that is dropped with the client."""
+        await self.flush_hubspot()
+        if self._hubspot_flush is not None and not self._hubspot_flush.done():
+            self._hubspot_flush.cancel()
+
+    async def flush_hubspot(self):
+        """Send queued contact updates via batch/update — ceil(N/100) requests instead of N."""
+        pending, self._hubspot_pending = self._hubspot_pending, {}
+        inputs = [
+            {"id": email, "idProperty": "email", "properties": props}
+            for email, props in pending.items()
+        ]
         headers = {"Authorization": f"Bearer {HUBSPOT_API_KEY}", "Content-Type": "application/json"}
-        payload = {"properties": {"dealstage": stage, "amount": str(
-            {"starter": 15000, "growth": 35000, "premium": 75000}.get(package_key, 0)
-        )}}
+        retry = []
+        for start in range(0, len(inputs), HUBSPOT_BATCH_SIZE):
+            retry += await self._post_hubspot_batch(inputs[start:start + HUBSPOT_BATCH_SIZE], headers)
+        retry_ids = {item["id"] for item in retry}
+        for email in pending.keys() - retry_ids:
+            self._hubspot_attempts.pop(email, None)
+        # Transient failure (network, 429, 5xx) — put them back unless a newer update
+        # arrived meanwhile, backing off exponentially and giving up after HUBSPOT_MAX_TRIES
+        requeued = 0
+        for item in retry:
+            email = item["id"]
+            if email in self._hubspot_pending:
+                continue
+            attempts = self._hubspot_attempts.get(email, 0) + 1
+            if attempts >= HUBSPOT_MAX_TRIES:
+                self._hubspot_attempts.pop(email, None)
+                print(f"  [HubSpot] ERROR: giving up on update for {email} after {attempts} attempts")
+                continue
+            self._hubspot_attempts[email] = attempts
+            self._hubspot_pending[email] = item["properties"]
+            requeued += 1
+        if requeued:
+            worst = max(self._hubspot_attempts.get(e, 0) for e in self._hubspot_pending)
+            delay = min(HUBSPOT_FLUSH_DELAY * 2 ** worst, HUBSPOT_MAX_BACKOFF)
+            print(f"  [HubSpot] Re-queued {requeued} contact update(s), retrying in {delay:.0f}s")
+            if self._hubspot_flush is None or self._hubspot_flush.done():
+                self._hubspot_flush = asyncio.create_task(self._flush_hubspot_later(delay))
+
+    async def _post_hubspot_batch(self, inputs: list[dict], headers: dict) -> list[dict]:
+        """
+        POST one batch; returns the inputs worth retrying later. A 4xx rejects the
+        whole batch when any contact in it is bad, so the batch is split in half until
+        the offending contact is isolated and dropped.
+        """
         try:
-            httpx.patch(
-                f"https://api.hubapi.com/crm/v3/objects/contacts/{lead.get('email')}",
-                headers=headers, json=payload
+            resp = await self.http.post(
+                "https://api.hubapi.com/crm/v3/objects/contacts/batch/update",
+                headers=headers,
+                content=orjson.dumps({"inputs": inputs})
             )
         except Exception as e:
             print(f"  [HubSpot] Error: {e}")
+            return inputs
+        if resp.status_code == 207:   # partial success — the rest went through
+            for err in orjson.loads(resp.content).get("errors", []):
+                print(f"  [HubSpot] Update failed: {err.get('message')}")
+            return []
+        if resp.is_success:
+            return []
+        if resp.status_code == 429 or resp.status_code >= 500:
+            print(f"  [HubSpot] Batch of {len(inputs)} failed ({resp.status_code}), will retry")
+            return inputs
+        if len(inputs) == 1:
+            print(f"  [HubSpot] Dropping update for {inputs[0]['id']}: {resp.status_code} {resp.text[:200]}")
+            return []
+        mid = len(inputs) // 2
+        return (await self._post_hubspot_batch(inputs[:mid], headers)
+                + await self._post_hubspot_batch(inputs[mid:], headers))
 
-    def _trigger_onboarding(self, lead: dict, package_key: str):
+    async def _trigger_onboarding(self, lead: dict, package_key: str):
         """Trigger onboarding workflow (e.g., n8n, Zapier, or your own)."""
         onboarding_webhook = os.getenv("ONBOARDING_WEBHOOK_URL")
         if onboarding_webhook:
-            httpx.post(onboarding_webhook, json={
+            await self.http.post(onboarding_webhook, headers=_JSON_HEADERS, content=orjson.dumps({
                 "lead": lead,
                 "package": package_key,
-                "triggered_at": datetime.utcnow().isoformat()
-            })
+                "triggered_at": datetime.now(timezone.utc).isoformat()
+            }))
             print(f"  [Onboarding] Workflow triggered for {lead['name']}")
 
 
+# ── Follow-up job entry point ─────────────────────────────────────────────────
+_orchestrator: Optional["SalesAgentOrchestrator"] = None
+
+async def run_followup(lead_id: str, followup_num: int):
+    """Module-level so SQLAlchemyJobStore can store a reference to it (bound methods can't be)."""
+    await _orchestrator.process_single_followup(lead_id, followup_num)
+
+
 # ── Main Orchestrator ─────────────────────────────────────────────────────────
 class SalesAgentOrchestrator:
     """
@@ -248,107 +555,178 @@ class SalesAgentOrchestrator:
         self.caller      = VapiCallManager()
         self.outreach    = OutreachOrchestrator()
         self.agent_brain = SalesAgentBrain()
-        self.closer      = DealCloser()
-        self.handoff     = HumanHandoff()
-        self.scheduler   = BackgroundScheduler()
+        # One pooled keep-alive client for every CRM / contract / Slack / onboarding call —
+        # TLS to HubSpot/PandaDoc/Slack is paid once, not per request
+        self.http        = httpx.AsyncClient(
+            http2=True,
+            timeout=10.0,
+            limits=httpx.Limits(max_keepalive_connections=20, max_connections=100, keepalive_expiry=60.0),
+        )
+        self.handoff     = HumanHandoff(self.http)
+        self.closer      = DealCloser(self.http, self.handoff)
+        # Per-lead follow-up jobs persist next to the leads so they survive restarts;
+        # the interval jobs hold bound methods, so they stay in memory
+        self.scheduler   = AsyncIOScheduler(
+            jobstores={
+                "default":   MemoryJobStore(),
+                "followups": SQLAlchemyJobStore(url=f"sqlite:///{self.state.db_path}"),
+            },
+            # A tick that overruns its interval never overlaps itself, and missed runs
+            # collapse into one instead of replaying back to back
+            job_defaults={"max_instances": 1, "coalesce": True, "misfire_grace_time": 3600},
+        )
+        global _orchestrator
+        _orchestrator = self
 
     def start(self):
         """Start the orchestrator."""
         print("\n🚀 AI Sales Agent Orchestrator STARTED")
         print("=" * 50)
         
-        # Run new lead outreach every 2 hours
+        # Run new lead outreach every 2 hours — first run right away
         self.scheduler.add_job(
             self.process_new_leads,
             IntervalTrigger(hours=2),
-            id="new_leads"
+            id="new_leads",
+            next_run_time=datetime.now(timezone.utc)
         )
         
-        # Check follow-ups every 6 hours
-        self.scheduler.add_job(
-            self.process_followups,
-            IntervalTrigger(hours=6),
-            id="followups"
-        )
+        # One-off on start: line up follow-up jobs for leads already in the pipeline
+        self.scheduler.add_job(self.process_followups, id="followups_backfill")
         
-        # Run immediately on start
+        # Standalone worker: the scheduler lives on this loop; run_forever is the only wait
+        loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(loop)
         self.scheduler.start()
-        self.process_new_leads()
-        self.process_followups()
         
         print("\n✅ Scheduler running. Press Ctrl+C to stop.")
         try:
-            while True:
-                time.sleep(60)
+            loop.run_forever()
         except (KeyboardInterrupt, SystemExit):
             self.scheduler.shutdown()
+            loop.run_until_complete(self.aclose())
             print("\nOrchestrator stopped.")
 
-    def process_new_leads(self):
-        """Process all new leads: call + email + WhatsApp."""
+    async def aclose(self):
+        await self.closer.aclose()
+        await self.http.aclose()
+        await self.outreach.aclose()
+
+    async def process_new_leads(self):
+        """Process all new leads: call + email + WhatsApp, up to OUTREACH_MAX_CONCURRENT at once."""
+        # Pick up leads module1 wrote to leads.json since the last tick (existing ids are skipped)
+        await asyncio.to_thread(self.state.import_json)
         new_leads = self.state.get_leads_by_stage("new")
         print(f"\n[Orchestrator] Processing {len(new_leads)} new leads...")
         
-        for lead in new_leads:
+        # One timestamp for the whole tick — every lead in it is stamped "contacted" at tick start
+        now_iso = datetime.now(timezone.utc).isoformat()
+        sem = asyncio.Semaphore(OUTREACH_MAX_CONCURRENT)
+        await asyncio.gather(*(self._handle_new(lead, sem, now_iso) for lead in new_leads))
+        await self.closer.flush_hubspot()
+
+    async def _handle_new(self, lead: dict, sem: asyncio.Semaphore, now_iso: str):
+        async with sem:
             print(f"  → {lead['name']} ({lead.get('website')})")
             
             # 1. Make AI call
             if lead.get("phone"):
                 try:
-                    self.caller.make_outbound_call(lead)
-                    time.sleep(5)  # brief pause between calls
+                    await asyncio.to_thread(self.caller.make_outbound_call, lead)
+                    await asyncio.sleep(5)  # brief pause between calls
                 except Exception as e:
                     print(f"    [Call Failed] {e}")
             
             # 2. Send email + WhatsApp
-            self.outreach.initial_outreach(lead)
+            await self.outreach.ainitial_outreach(lead)
             
-            # 3. Update stage
+            # 3. Update stage + line up its follow-ups
             self.state.update_lead(
-                lead.get("email") or lead.get("phone"),
-                {"stage": "contacted", "contacted_at": datetime.utcnow().isoformat()}
+                lead["id"],
+                {"stage": "contacted", "contacted_at": now_iso}
             )
+            self._schedule_next_followup(lead)
             
-            time.sleep(30)  # 30s between each lead
+            await asyncio.sleep(30)  # 30s between leads in the same slot
 
-    def process_followups(self):
-        """Process leads due for follow-up."""
-        due_leads = self.state.get_leads_needing_followup()
-        print(f"\n[Orchestrator] {len(due_leads)} leads due for follow-up...")
+    def _schedule_next_followup(self, lead: dict, last_sent_ts: Optional[float] = None):
+        """
+        Schedule only the next follow-up owed (#followup_count + 1) — #n+1 is added once #n
+        has gone out, so overdue follow-ups can never fire together after a restart.
+        Due at created_at + FOLLOWUP_SCHEDULE[n], but never sooner after the previous send
+        than the schedule's own gap between the two.
+        """
+        lead_id = lead["id"]
+        done = lead.get("followup_count", 0)
+        # Jobs for later follow-ups (from before chaining) would bypass the spacing
+        for stale in range(done + 2, len(FOLLOWUP_SCHEDULE) + 1):
+            try:
+                self.scheduler.remove_job(f"fu_{lead_id}_{stale}", jobstore="followups")
+            except JobLookupError:
+                pass
+        if done >= len(FOLLOWUP_SCHEDULE):
+            return
         
-        for lead in due_leads:
-            followup_num = lead.pop("_followup_number", 1)
-            print(f"  → Follow-up #{followup_num} for {lead['name']}")
-            
-            # Call + WhatsApp + Email
-            if lead.get("phone"):
-                try:
-                    self.caller.make_outbound_call(lead)
-                except Exception as e:
-                    print(f"    [Call Failed] {e}")
-            
-            self.outreach.send_followup(lead, followup_num)
-            
-            # Update follow-up count
-            self.state.update_lead(
-                lead.get("email") or lead.get("phone"),
-                {
-                    "followup_count": followup_num,
-                    f"followup_{followup_num}_at": datetime.utcnow().isoformat()
-                }
-            )
-            
-            # If max follow-ups reached, mark as cold
-            if followup_num >= len(FOLLOWUP_SCHEDULE):
-                self.state.update_lead(
-                    lead.get("email") or lead.get("phone"),
-                    {"stage": "cold"}
-                )
-                print(f"    → Marked as cold after {followup_num} follow-ups")
-            
-            time.sleep(30)
+        followup_num = done + 1
+        created_ts = lead.get("created_at_ts") or time.time()
+        run_ts = created_ts + FOLLOWUP_SCHEDULE[done] * 86400
+        if done and last_sent_ts:
+            gap_days = FOLLOWUP_SCHEDULE[done] - FOLLOWUP_SCHEDULE[done - 1]
+            run_ts = max(run_ts, last_sent_ts + gap_days * 86400)
+        self.scheduler.add_job(
+            run_followup,
+            DateTrigger(run_date=datetime.fromtimestamp(run_ts, timezone.utc)),
+            args=[lead_id, followup_num],
+            id=f"fu_{lead_id}_{followup_num}",
+            jobstore="followups",
+            replace_existing=True,
+            misfire_grace_time=None,   # overdue after a restart → still send it (just this one)
+        )
+
+    @staticmethod
+    def _last_followup_ts(lead: dict) -> Optional[float]:
+        sent_at = lead.get(f"followup_{lead.get('followup_count', 0)}_at")
+        if not sent_at:
+            return None
+        sent = datetime.fromisoformat(sent_at)
+        if sent.tzinfo is None:   # stored as naive UTC
+            sent = sent.replace(tzinfo=timezone.utc)
+        return sent.timestamp()
+
+    async def process_followups(self):
+        """
+        Backfill: make sure every lead in a follow-up stage has its next follow-up job.
+        Scheduling is idempotent (job ids are per lead + follow-up number).
+        """
+        leads = self.state.get_leads_by_stage(*FOLLOWUP_STAGES)
+        print(f"\n[Orchestrator] Scheduling follow-ups for {len(leads)} leads...")
+        for lead in leads:
+            self._schedule_next_followup(lead, self._last_followup_ts(lead))
+
+    async def process_single_followup(self, lead_id: str, followup_num: int):
+        """Send follow-up #n to one lead — fired by its DateTrigger job."""
+        lead = self.state.claim_followup(lead_id, followup_num)
+        if not lead:
+            return   # replied, closed, gone cold, already sent, or out of order
+        print(f"  → Follow-up #{followup_num} for {lead['name']}")
+        sent_ts = time.time()
+        
+        # Call + WhatsApp + Email
+        if lead.get("phone"):
+            try:
+                await asyncio.to_thread(self.caller.make_outbound_call, lead)
+            except Exception as e:
+                print(f"    [Call Failed] {e}")
+        
+        await self.outreach.asend_followup(lead, followup_num)
+        
+        # Max follow-ups reached — claim_followup already marked it cold
+        if followup_num >= len(FOLLOWUP_SCHEDULE):
+            print(f"    → Marked as cold after {followup_num} follow-ups")
+        else:
+            self._schedule_next_followup(lead, last_sent_ts=sent_ts)
 
-    def handle_response(self, lead_identifier: str, message: str, channel: str = "whatsapp"):
+    async def handle_response(self, lead_identifier: str, message: str, channel: str = "whatsapp"):
         """
         Call this when a lead responds (via WhatsApp webhook, email reply, etc.)
         
@@ -357,37 +735,38 @@ class SalesAgentOrchestrator:
             message: what the prospect said
             channel: "call" | "email" | "whatsapp"
         """
-        leads = self.state.load_all()
-        lead = next((l for l in leads if l.get("email") == lead_identifier or l.get("phone") == lead_identifier), None)
+        lead = self.state.get(lead_identifier)
         
         if not lead:
             print(f"[Warning] Lead not found: {lead_identifier}")
             return None
         
-        result = self.agent_brain.chat(lead, message, channel=channel)
+        result = await self.agent_brain.achat(lead, message, channel=channel)
         
         print(f"  [AI Response] Stage: {result['stage']} | Action: {result['action']}")
         
         # Update stage in state
-        self.state.update_lead(lead_identifier, {"stage": result["stage"]})
+        self.state.update_lead(lead["id"], {"stage": result["stage"]})
         
         # Handle actions
         if result["action"] == "send_quote":
             package = result.get("suggested_package") or "growth"
-            self.outreach.send_quote(lead, package)
+            await self.outreach.asend_quote(lead, package)
             print(f"  [Quote] Sent {package} package to {lead['name']}")
         
         elif result["action"] == "close":
             package = result.get("suggested_package") or "growth"
-            self.closer.close_deal(lead, package)
+            await self.closer.close_deal(lead, package)
         
         elif result["action"] == "human_handoff":
-            self.handoff.alert(lead, "Prospect requested specific info beyond AI scope", message)
+            await self.handoff.alert(lead, "Prospect requested specific info beyond AI scope", message)
         
         return result["response"]
 
 
 # ── Entry Point ───────────────────────────────────────────────────────────────
 if __name__ == "__main__":
+    # Import by module name so persisted jobs reference module5_orchestrator:run_followup, not __main__
+    from module5_orchestrator import SalesAgentOrchestrator
     orchestrator = SalesAgentOrchestrator()
     orchestrator.start()